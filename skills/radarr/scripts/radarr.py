@@ -1,33 +1,157 @@
 #!/usr/bin/env python3
-"""Minimal Radarr API wrapper. Requires RADARR_URL and RADARR_API_KEY env vars."""
+"""Minimal Radarr API wrapper. Requires RADARR_URL and RADARR_API_KEY env vars.
+
+Optional: RADARR_CACHE_DIR (default ~/.cache/radarr), RADARR_LIBRARY_TTL
+(seconds before the local library index is re-downloaded, default 3600),
+RADARR_MAX_CONNECTIONS (default 10) and RADARR_RETRIES (retries on 429/503,
+default 3).
+"""
 # /// script
 # dependencies = ["httpx"]
 # ///
 
 import os
+import atexit
+import hashlib
+import re
 import sys
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional
 import httpx
 
 BASE_URL = os.environ.get("RADARR_URL", "").rstrip("/")
 API_KEY = os.environ.get("RADARR_API_KEY", "")
+CACHE_DIR = Path(os.environ.get("RADARR_CACHE_DIR") or Path.home() / ".cache" / "radarr")
+LIBRARY_TTL = int(os.environ.get("RADARR_LIBRARY_TTL", 3600))
+MAX_CONNECTIONS = int(os.environ.get("RADARR_MAX_CONNECTIONS", 10))
+MAX_RETRIES = int(os.environ.get("RADARR_RETRIES", 3))
+RETRY_STATUSES = {429, 503}
+LIBRARY_VERSION = 2  # bump when movie_record gains fields so old snapshots are re-downloaded
 
-def api(endpoint: str, params: dict = None) -> dict:
-    """Make authenticated GET request to Radarr API."""
-    if not BASE_URL or not API_KEY:
-        sys.exit("Error: Set RADARR_URL and RADARR_API_KEY environment variables")
-    url = f"{BASE_URL}/api/v3/{endpoint.lstrip('/')}"
-    resp = httpx.get(url, params=params, headers={"X-Api-Key": API_KEY}, timeout=30)
+_library: Optional[dict] = None
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+def get_client() -> httpx.Client:
+    """Return the process-wide keep-alive client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if not BASE_URL or not API_KEY:
+                sys.exit("Error: Set RADARR_URL and RADARR_API_KEY environment variables")
+            _client = httpx.Client(
+                base_url=f"{BASE_URL}/api/v3/",
+                headers={"X-Api-Key": API_KEY},
+                timeout=60,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+            )
+            atexit.register(_client.close)
+    return _client
+
+def retry_delay(resp: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying, honouring Retry-After when given."""
+    retry_after = resp.headers.get("Retry-After", "")
+    return float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+
+def request(method: str, endpoint: str, **kwargs) -> httpx.Response:
+    """Send a request on the shared client, backing off and retrying on 429/503."""
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        resp = client.request(method, endpoint.lstrip("/"), **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        time.sleep(retry_delay(resp, attempt))
     resp.raise_for_status()
-    return resp.json()
+    return resp
 
-def list_movies():
-    """List all movies in library."""
-    movies = api("movie")
-    for m in sorted(movies, key=lambda x: x["title"]):
-        year = m.get("year", "?")
-        status = "Downloaded" if m.get("hasFile") else "Missing"
-        print(f"{m['title']} ({year}) - {status}")
+def api(endpoint: str, params: Optional[dict] = None) -> Any:
+    """Make authenticated GET request to Radarr API."""
+    return request("GET", endpoint, params=params).json()
+
+def api_post(endpoint: str, payload: dict) -> Any:
+    """Make authenticated POST request to Radarr API."""
+    return request("POST", endpoint, json=payload).json()
+
+def api_put(endpoint: str, payload: dict) -> Any:
+    """Make authenticated PUT request to Radarr API."""
+    return request("PUT", endpoint, json=payload).json()
+
+def api_delete(endpoint: str) -> None:
+    """Make authenticated DELETE request to Radarr API."""
+    request("DELETE", endpoint)
+
+_decoder = json.JSONDecoder()
+
+def iter_json_array(chunks: Iterator[str]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array as its text arrives in chunks."""
+    buf, pos, opened = "", 0, False
+    for chunk in chunks:
+        buf = buf[pos:] + chunk
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                break
+            if not opened:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                opened = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element not complete yet; wait for the next chunk
+            rest = buf[end:end + 64].lstrip()
+            if not rest or rest[0] not in ",]":
+                break  # a trailing scalar such as "3." may continue in the next chunk
+            pos = end
+            yield item
+    raise ValueError("Truncated JSON array")
+
+def stream_api(endpoint: str, params: Optional[dict] = None) -> Iterator[Any]:
+    """GET a JSON array endpoint and yield its elements while the body is still downloading."""
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        with client.stream("GET", endpoint.lstrip("/"), params=params) as resp:
+            if resp.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                delay = retry_delay(resp, attempt)
+            else:
+                resp.raise_for_status()
+                yield from iter_json_array(resp.iter_text())
+                return
+        time.sleep(delay)
+
+class MovieRow:
+    """The few /movie fields list prints, without images, ratings and alternate titles."""
+    __slots__ = ("title", "year", "has_file")
+
+    def __init__(self, m: dict):
+        self.title = m["title"]
+        self.year = m.get("year", "?")
+        self.has_file = bool(m.get("hasFile"))
+
+    def __str__(self) -> str:
+        status = "Downloaded" if self.has_file else "Missing"
+        return f"{self.title} ({self.year}) - {status}"
+
+def list_movies(unsorted: bool = False):
+    """List all movies in library, parsing /movie as it streams in."""
+    rows = (MovieRow(m) for m in stream_api("movie"))
+    if unsorted:
+        for row in rows:
+            print(row, flush=True)
+        return
+    for row in sorted(rows, key=lambda r: r.title):
+        print(row)
 
 def search_movies(term: str):
     """Search for movies by name."""
@@ -42,19 +166,532 @@ def get_movie(movie_id: int):
     m = api(f"movie/{movie_id}")
     print(json.dumps(m, indent=2))
 
+@lru_cache(maxsize=None)
+def get_quality_profiles():
+    """Return quality profiles (fetched once per process)."""
+    return api("qualityprofile")
+
+def resolve_quality_profile_id(quality: str) -> int:
+    profiles = get_quality_profiles()
+    if quality.isdigit():
+        qid = int(quality)
+        if any(p["id"] == qid for p in profiles):
+            return qid
+    for p in profiles:
+        if p["name"].lower() == quality.lower():
+            return p["id"]
+    names = ", ".join(p["name"] for p in profiles)
+    sys.exit(f"Error: Unknown quality profile '{quality}'. Available: {names}")
+
+@lru_cache(maxsize=None)
+def get_root_folders():
+    """Return root folders (fetched once per process)."""
+    return api("rootfolder")
+
+def resolve_root_folder_path(root: Optional[str] = None) -> str:
+    folders = get_root_folders()
+    if root:
+        for f in folders:
+            if f["path"] == root:
+                return f["path"]
+        paths = ", ".join(f["path"] for f in folders)
+        sys.exit(f"Error: Unknown root folder '{root}'. Available: {paths}")
+    if not folders:
+        sys.exit("Error: No root folders configured in Radarr")
+    return folders[0]["path"]
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and collapse punctuation/whitespace for matching."""
+    title = re.sub(r"['’]", "", title.lower()).replace("&", " and ")
+    return re.sub(r"[^a-z0-9]+", " ", title).strip()
+
+def movie_record(m: dict) -> dict:
+    """The fields of a /movie entry kept in the library index (lookups and bulk-edit filters)."""
+    quality = ((m.get("movieFile") or {}).get("quality") or {}).get("quality") or {}
+    return {
+        "id": m["id"],
+        "tmdbId": m.get("tmdbId"),
+        "title": m.get("title", ""),
+        "year": m.get("year"),
+        "hasFile": bool(m.get("hasFile")),
+        "quality": quality.get("name"),
+        "qualityProfileId": m.get("qualityProfileId"),
+        "monitored": bool(m.get("monitored")),
+        "tags": m.get("tags", []),
+        "path": m.get("path", ""),
+    }
+
+def index_library(records: list, fetched: float) -> dict:
+    """Build id, tmdbId and normalized-title lookups over library records."""
+    by_title = {}
+    for r in records:
+        by_title.setdefault(normalize_title(r["title"]), []).append(r)
+    return {
+        "fetched": fetched,
+        "by_id": {r["id"]: r for r in records},
+        "by_tmdb": {r["tmdbId"]: r for r in records if r.get("tmdbId")},
+        "by_title": by_title,
+    }
+
+def save_library(library: dict):
+    """Persist the library index to disk."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / "library.json"
+    tmp = path.with_suffix(".tmp")
+    data = {
+        "url": BASE_URL,
+        "version": LIBRARY_VERSION,
+        "fetched": library["fetched"],
+        "movies": list(library["by_id"].values()),
+    }
+    tmp.write_text(json.dumps(data, separators=(",", ":")))
+    tmp.replace(path)
+
+def load_library(refresh: bool = False) -> dict:
+    """Return the library index, from disk while fresh, else re-downloaded from /movie."""
+    global _library
+    if _library is not None and not refresh:
+        return _library
+    path = CACHE_DIR / "library.json"
+    if not refresh and path.exists():
+        data = json.loads(path.read_text())
+        fresh = time.time() - data.get("fetched", 0) < LIBRARY_TTL
+        if data.get("url") == BASE_URL and data.get("version") == LIBRARY_VERSION and fresh:
+            _library = index_library(data["movies"], data["fetched"])
+            return _library
+    _library = index_library([movie_record(m) for m in stream_api("movie")], time.time())
+    save_library(_library)
+    return _library
+
+def library_add(movie: dict):
+    """Record a newly added movie in the library index."""
+    library = load_library()
+    record = movie_record(movie)
+    library["by_id"][record["id"]] = record
+    if record["tmdbId"]:
+        library["by_tmdb"][record["tmdbId"]] = record
+    library["by_title"].setdefault(normalize_title(record["title"]), []).append(record)
+    save_library(library)
+
+def library_remove(movie_id: int):
+    """Drop a deleted movie from the library index."""
+    library = load_library()
+    record = library["by_id"].pop(movie_id, None)
+    if record:
+        library["by_tmdb"].pop(record.get("tmdbId"), None)
+        key = normalize_title(record["title"])
+        remaining = [r for r in library["by_title"].get(key, []) if r["id"] != movie_id]
+        if remaining:
+            library["by_title"][key] = remaining
+        else:
+            library["by_title"].pop(key, None)
+        save_library(library)
+
+def split_year(term: str) -> tuple:
+    """Split a trailing "(1999)" year off a title; bare numbers stay part of it ("Blade Runner 2049")."""
+    m = re.match(r"^(.*?)\s*\((\d{4})\)$", term.strip())
+    if m and m.group(1):
+        return m.group(1), int(m.group(2))
+    return term, None
+
+def find_library_movie(term: str) -> dict:
+    """Find a library movie by title, optionally with its year, else exit."""
+    title, year = split_year(term)
+    matches = load_library()["by_title"].get(normalize_title(title), [])
+    if year:
+        matches = [r for r in matches if r.get("year") == year] or matches
+    if not matches:
+        sys.exit(f"Error: Movie not found in library: '{term}'")
+    if len(matches) > 1:
+        years = ", ".join(str(r.get("year", "?")) for r in matches)
+        sys.exit(f"Error: Several library movies match '{term}' ({years}); add the year")
+    return matches[0]
+
+def find_existing_movie(tmdb_id: int) -> bool:
+    return tmdb_id in load_library()["by_tmdb"]
+
+def pick_best_match(results: list, term: str) -> dict:
+    title, year = split_year(term)
+    wanted = normalize_title(title)
+    matches = [m for m in results if normalize_title(m.get("title", "")) == wanted]
+    if year:
+        matches = [m for m in matches if m.get("year") == year]
+    if matches:
+        return matches[0]
+    top = "; ".join(f"{r.get('title', 'Unknown')} ({r.get('year', '?')})" for r in results[:5])
+    sys.exit(f"Error: No exact title match for '{term}'. Top results: {top}")
+
+def build_add_payload(movie: dict, quality: str, root: Optional[str] = None, search: bool = True) -> dict:
+    """Build the POST /movie body for a lookup result."""
+    return {
+        "title": movie.get("title"),
+        "tmdbId": movie.get("tmdbId"),
+        "year": movie.get("year"),
+        "qualityProfileId": resolve_quality_profile_id(quality),
+        "rootFolderPath": resolve_root_folder_path(root),
+        "monitored": True,
+        "minimumAvailability": "released",
+        "addOptions": {"searchForMovie": bool(search)},
+    }
+
+def add_movie(term: str, quality: str, root: Optional[str] = None, search: bool = True):
+    # Lookup, library index, profiles and root folders are independent; fetch them together
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        lookup = pool.submit(api, "movie/lookup", {"term": split_year(term)[0]})
+        prerequisites = [pool.submit(load_library), pool.submit(get_quality_profiles), pool.submit(get_root_folders)]
+        results = lookup.result()
+        for future in prerequisites:
+            future.result()
+    if not results:
+        sys.exit(f"Error: No movies found for '{term}'")
+    movie = pick_best_match(results, term)
+    tmdb_id = movie.get("tmdbId")
+    title = movie.get("title", term)
+    if not tmdb_id:
+        sys.exit(f"Error: Missing TMDB ID for '{title}'")
+    if find_existing_movie(tmdb_id):
+        print(f"Already in library: {title}")
+        return
+
+    added = api_post("movie", build_add_payload(movie, quality, root, search))
+    library_add(added)
+    print(f"Added: {added.get('title', title)} ({added.get('year', '?')})")
+
+class RateLimiter:
+    """Space calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+def run_step(fn, *args) -> tuple:
+    """Run one bulk step, returning (result, error message) instead of exiting."""
+    try:
+        return fn(*args), None
+    except SystemExit as e:
+        return None, str(e.code).removeprefix("Error: ")
+    except httpx.HTTPError as e:
+        return None, str(e)
+
+def parse_bulk_lines(lines: list, quality: Optional[str], root: Optional[str]) -> list:
+    """Parse 'term [| quality [| root]]' lines, skipping blanks and # comments."""
+    entries = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [p.strip() for p in line.split("|")]
+        entries.append({
+            "line": number,
+            "term": parts[0],
+            "quality": (parts[1] if len(parts) > 1 and parts[1] else quality),
+            "root": (parts[2] if len(parts) > 2 and parts[2] else root),
+        })
+    return entries
+
+def bulk_add(source: str, quality: Optional[str], root: Optional[str] = None, search: bool = True,
+             concurrency: int = 4, rate: float = 2.0):
+    """Add every movie listed in a file (or stdin with '-'), resuming a previous run."""
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+        state_key = hashlib.sha1("\n".join(lines).encode()).hexdigest()
+    else:
+        lines = Path(source).read_text().splitlines()
+        state_key = hashlib.sha1(str(Path(source).resolve()).encode()).hexdigest()
+    entries = parse_bulk_lines(lines, quality, root)
+    state_path = CACHE_DIR / "bulk" / f"{state_key}.json"
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+
+    def record(entry: dict, status: str, title: str = "", message: str = ""):
+        state[str(entry["line"])] = {"term": entry["term"], "status": status, "title": title, "message": message}
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        tmp.replace(state_path)
+
+    pending = []
+    for entry in entries:
+        previous = state.get(str(entry["line"]))
+        if previous and previous["term"] == entry["term"] and previous["status"] in ("added", "exists"):
+            continue
+        pending.append(entry)
+
+    # One library snapshot and profile/root lists for the whole batch
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        for future in [pool.submit(load_library), pool.submit(get_quality_profiles), pool.submit(get_root_folders)]:
+            future.result()
+
+    limiter = RateLimiter(rate)
+    claimed = set()
+
+    def post(payload):
+        limiter.wait()
+        return run_step(api_post, "movie", payload)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as lookups, ThreadPoolExecutor(max_workers=concurrency) as posts:
+        lookup_futures = {
+            lookups.submit(run_step, api, "movie/lookup", {"term": split_year(e["term"])[0]}): e for e in pending
+        }
+        post_futures = {}
+        for future in as_completed(lookup_futures):
+            entry = lookup_futures[future]
+            results, error = future.result()
+            if error:
+                record(entry, "error", message=error)
+                continue
+            if not results:
+                record(entry, "error", message=f"No movies found for '{entry['term']}'")
+                continue
+            movie, error = run_step(pick_best_match, results, entry["term"])
+            if error:
+                record(entry, "error", message=error)
+                continue
+            tmdb_id = movie.get("tmdbId")
+            title = f"{movie.get('title', entry['term'])} ({movie.get('year', '?')})"
+            if not tmdb_id:
+                record(entry, "error", title, f"Missing TMDB ID for '{title}'")
+                continue
+            if tmdb_id in claimed or find_existing_movie(tmdb_id):
+                record(entry, "exists", title)
+                continue
+            if not entry["quality"]:
+                record(entry, "error", title, "No quality profile given (use --quality or 'term | quality')")
+                continue
+            payload, error = run_step(build_add_payload, movie, entry["quality"], entry["root"], search)
+            if error:
+                record(entry, "error", title, error)
+                continue
+            claimed.add(tmdb_id)
+            post_futures[posts.submit(post, payload)] = (entry, title)
+
+        for future in as_completed(post_futures):
+            entry, title = post_futures[future]
+            added, error = future.result()
+            if error:
+                record(entry, "error", title, error)
+                continue
+            library_add(added)
+            record(entry, "added", title)
+
+    counts = {}
+    for entry in entries:
+        result = state.get(str(entry["line"]), {"status": "error", "title": "", "message": "not processed"})
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        detail = result["message"] or result["title"]
+        print(f"{entry['line']:>4}  {result['status']:<7}  {entry['term']}" + (f"  ->  {detail}" if detail else ""))
+    print("\n" + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    if counts.get("error"):
+        sys.exit(1)
+
+@lru_cache(maxsize=None)
+def get_tags():
+    """Return tags (fetched once per process)."""
+    return api("tag")
+
+def resolve_tag_ids(refs: str) -> list:
+    """Resolve a comma-separated list of tag labels or ids."""
+    tags = get_tags()
+    ids = []
+    for ref in (r.strip() for r in refs.split(",") if r.strip()):
+        match = next((t["id"] for t in tags if str(t["id"]) == ref or t["label"].lower() == ref.lower()), None)
+        if match is None:
+            labels = ", ".join(t["label"] for t in tags)
+            sys.exit(f"Error: Unknown tag '{ref}'. Available: {labels}")
+        ids.append(match)
+    return ids
+
+def parse_year_range(value: str) -> tuple:
+    """Parse "2010" or "1990-1999" into an inclusive (low, high) pair."""
+    low, _, high = value.partition("-")
+    try:
+        return int(low), int(high or low)
+    except ValueError:
+        sys.exit(f"Error: Invalid year or range '{value}'")
+
+def select_movies(records, year: Optional[str] = None, has_file: Optional[bool] = None,
+                  quality: Optional[str] = None, tag: Optional[str] = None,
+                  path_prefix: Optional[str] = None) -> list:
+    """Filter library records on year, file presence, file quality, tag and path prefix."""
+    low, high = parse_year_range(year) if year else (None, None)
+    tag_ids = set(resolve_tag_ids(tag)) if tag else set()
+    quality = quality.lower() if quality else None
+    selected = []
+    for r in records:
+        if low is not None and not (r.get("year") and low <= r["year"] <= high):
+            continue
+        if has_file is not None and r["hasFile"] != has_file:
+            continue
+        if quality and (r.get("quality") or "").lower() != quality:
+            continue
+        if tag_ids and not tag_ids & set(r["tags"]):
+            continue
+        if path_prefix and not r["path"].startswith(path_prefix):
+            continue
+        selected.append(r)
+    return selected
+
+def bulk_edit(filters: dict, monitored: Optional[bool] = None, quality_profile: Optional[str] = None,
+              add_tags: Optional[str] = None, remove_tags: Optional[str] = None,
+              chunk_size: int = 200, dry_run: bool = False, refresh: bool = False, select_all: bool = False):
+    """Apply monitored/profile/tag changes to filtered library movies via chunked PUT movie/editor."""
+    changes = {}
+    if monitored is not None:
+        changes["monitored"] = monitored
+    if quality_profile:
+        changes["qualityProfileId"] = resolve_quality_profile_id(quality_profile)
+    if add_tags and remove_tags:
+        sys.exit("Error: Use either --add-tags or --remove-tags, not both")
+    if add_tags or remove_tags:
+        changes["tags"] = resolve_tag_ids(add_tags or remove_tags)
+        changes["applyTags"] = "add" if add_tags else "remove"
+    if not changes and not dry_run:
+        sys.exit("Error: Nothing to change (use --monitored, --unmonitored, --set-quality, --add-tags or --remove-tags)")
+    if not select_all and all(value is None for value in filters.values()):
+        sys.exit("Error: No filters given; pass at least one filter or --all to edit the whole library")
+
+    # Filters on hasFile/quality must not act on a stale snapshot when changes will be sent
+    library = load_library(refresh or not dry_run)
+    movies = sorted(select_movies(library["by_id"].values(), **filters), key=lambda r: (r["title"], r.get("year") or 0))
+    print(f"Matched {len(movies)} movies")
+    if dry_run or not movies:
+        for r in movies:
+            print(f"  {r['title']} ({r.get('year', '?')}) - {r.get('quality') or 'no file'} - {r['path']}")
+        return
+
+    updated = 0
+    chunks = [movies[i:i + chunk_size] for i in range(0, len(movies), chunk_size)]
+    for n, chunk in enumerate(chunks, 1):
+        api_put("movie/editor", {"movieIds": [r["id"] for r in chunk], **changes})
+        # Mirror the edit in the snapshot so later filters see it without a re-download
+        for r in chunk:
+            if "monitored" in changes:
+                r["monitored"] = changes["monitored"]
+            if "qualityProfileId" in changes:
+                r["qualityProfileId"] = changes["qualityProfileId"]
+            if "tags" in changes:
+                current = set(r["tags"])
+                r["tags"] = sorted(current | set(changes["tags"]) if add_tags else current - set(changes["tags"]))
+        updated += len(chunk)
+        print(f"Updated {updated}/{len(movies)} (request {n}/{len(chunks)})", flush=True)
+    save_library(library)
+
+def delete_movie(term: str, delete_files: bool = False):
+    match = find_library_movie(term)
+    movie_id = match["id"]
+    flag = "true" if delete_files else "false"
+    try:
+        api_delete(f"movie/{movie_id}?deleteFiles={flag}&addImportExclusion=false")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 404:
+            raise
+        # Deleted outside this tool since the index was built
+        library_remove(movie_id)
+        sys.exit(f"Error: Movie not found in library: '{term}'")
+    library_remove(movie_id)
+    print(f"Deleted: {match['title']} ({match.get('year', '?')})")
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: radarr.py <command> [args]")
-        print("Commands: list, search <term>, get <id>")
+        print("Commands: list [--unsorted], search <term>, get <id|title>, delete <title> [--delete-files]")
+        print("          add <title [(year)]> --quality <name|id> [--root <path>] [--no-search]")
+        print("          add --from-file <path|-> [--quality <name|id>] [--root <path>] [--no-search] [--concurrency N] [--rate N]")
+        print("          bulk-edit [--all] [--year Y|Y1-Y2] [--has-file|--missing] [--quality <name>] [--tag <labels>] [--path-prefix <path>]")
+        print("                    [--monitored|--unmonitored] [--set-quality <name|id>] [--add-tags|--remove-tags <labels>]")
+        print("                    [--chunk-size N] [--dry-run] [--refresh]")
         sys.exit(1)
 
     cmd = sys.argv[1]
     if cmd == "list":
-        list_movies()
+        list_movies(unsorted="--unsorted" in sys.argv[2:])
     elif cmd == "search" and len(sys.argv) > 2:
         search_movies(" ".join(sys.argv[2:]))
     elif cmd == "get" and len(sys.argv) > 2:
-        get_movie(int(sys.argv[2]))
+        ref = " ".join(sys.argv[2:])
+        get_movie(int(ref) if ref.isdigit() else find_library_movie(ref)["id"])
+    elif cmd == "add" and len(sys.argv) > 2:
+        args = sys.argv[2:]
+        quality = None
+        root = None
+        search = True
+        source = None
+        concurrency = 4
+        rate = 2.0
+        term_parts = []
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg == "--quality" and i + 1 < len(args):
+                quality = args[i + 1]
+                i += 2
+                continue
+            if arg == "--root" and i + 1 < len(args):
+                root = args[i + 1]
+                i += 2
+                continue
+            if arg == "--from-file" and i + 1 < len(args):
+                source = args[i + 1]
+                i += 2
+                continue
+            if arg == "--concurrency" and i + 1 < len(args):
+                concurrency = max(1, int(args[i + 1]))
+                i += 2
+                continue
+            if arg == "--rate" and i + 1 < len(args):
+                rate = float(args[i + 1])
+                i += 2
+                continue
+            if arg == "--no-search":
+                search = False
+                i += 1
+                continue
+            term_parts.append(arg)
+            i += 1
+        if source:
+            bulk_add(source, quality, root, search, concurrency, rate)
+        else:
+            if not term_parts:
+                sys.exit("Error: Missing movie title")
+            if not quality:
+                sys.exit("Error: --quality is required for add")
+            add_movie(" ".join(term_parts), quality, root, search)
+    elif cmd == "bulk-edit":
+        args = sys.argv[2:]
+
+        def option(name: str) -> Optional[str]:
+            return args[args.index(name) + 1] if name in args and args.index(name) + 1 < len(args) else None
+
+        has_file = True if "--has-file" in args else False if "--missing" in args else None
+        monitored = True if "--monitored" in args else False if "--unmonitored" in args else None
+        bulk_edit(
+            {
+                "year": option("--year"),
+                "has_file": has_file,
+                "quality": option("--quality"),
+                "tag": option("--tag"),
+                "path_prefix": option("--path-prefix"),
+            },
+            monitored=monitored,
+            quality_profile=option("--set-quality"),
+            add_tags=option("--add-tags"),
+            remove_tags=option("--remove-tags"),
+            chunk_size=max(1, int(option("--chunk-size") or 200)),
+            dry_run="--dry-run" in args,
+            refresh="--refresh" in args,
+            select_all="--all" in args,
+        )
+    elif cmd == "delete" and len(sys.argv) > 2:
+        args = sys.argv[2:]
+        delete_movie(" ".join(a for a in args if a != "--delete-files"), "--delete-files" in args)
     else:
         print(f"Unknown command: {cmd}")
         sys.exit(1)
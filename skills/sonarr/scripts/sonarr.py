@@ -1,55 +1,179 @@
 #!/usr/bin/env python3
-"""Minimal Sonarr API wrapper. Requires SONARR_URL and SONARR_API_KEY env vars."""
+"""Minimal Sonarr API wrapper. Requires SONARR_URL and SONARR_API_KEY env vars.
+
+Optional: SONARR_CACHE_DIR (default ~/.cache/sonarr), SONARR_LIBRARY_TTL
+(seconds before the local library index is re-downloaded, default 3600),
+SONARR_LOOKUP_TTL / SONARR_LOOKUP_MAX (series/lookup cache lifetime in seconds
+and entry cap, default 3600 / 500), SONARR_MAX_CONNECTIONS (default 10), SONARR_RETRIES (retries on 429/503,
+default 3) and SONARR_HTTP2=1 (needs httpx[http2]).
+"""
 # /// script
 # dependencies = ["httpx"]
 # ///
 
 import os
+import atexit
+from array import array
+import hashlib
+import heapq
+import re
 import sys
 import json
-from typing import Any, Optional
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional
 import httpx
 
 BASE_URL = os.environ.get("SONARR_URL", "").rstrip("/")
 API_KEY = os.environ.get("SONARR_API_KEY", "")
+CACHE_DIR = Path(os.environ.get("SONARR_CACHE_DIR") or Path.home() / ".cache" / "sonarr")
+LIBRARY_TTL = int(os.environ.get("SONARR_LIBRARY_TTL", 3600))
+LOOKUP_TTL = int(os.environ.get("SONARR_LOOKUP_TTL", 3600))
+LOOKUP_MAX = int(os.environ.get("SONARR_LOOKUP_MAX", 500))
+LOOKUP_FIELDS = ("title", "year", "tvdbId", "seriesType")  # all that search, matching and add use
+MAX_CONNECTIONS = int(os.environ.get("SONARR_MAX_CONNECTIONS", 10))
+MAX_RETRIES = int(os.environ.get("SONARR_RETRIES", 3))
+RETRY_STATUSES = {429, 503}
+MATCH_MIN_SCORE = 0.6  # fuzzy matches below this are only offered as candidates
+MATCH_MARGIN = 0.1  # and the best one must beat the runner-up by this much
+
+_library: Optional[dict] = None
+_lookups: Optional[dict] = None
+_lookups_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+def get_client() -> httpx.Client:
+    """Return the process-wide keep-alive client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if not BASE_URL or not API_KEY:
+                sys.exit("Error: Set SONARR_URL and SONARR_API_KEY environment variables")
+            http2 = os.environ.get("SONARR_HTTP2", "").lower() in ("1", "true", "yes")
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    print("Warning: SONARR_HTTP2 needs httpx[http2]; using HTTP/1.1", file=sys.stderr)
+                    http2 = False
+            _client = httpx.Client(
+                base_url=f"{BASE_URL}/api/v3/",
+                headers={"X-Api-Key": API_KEY},
+                timeout=60,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                http2=http2,
+            )
+            atexit.register(_client.close)
+    return _client
+
+def retry_delay(resp: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying, honouring Retry-After when given."""
+    retry_after = resp.headers.get("Retry-After", "")
+    return float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+
+def request(method: str, endpoint: str, **kwargs) -> httpx.Response:
+    """Send a request on the shared client, backing off and retrying on 429/503."""
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        resp = client.request(method, endpoint.lstrip("/"), **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        time.sleep(retry_delay(resp, attempt))
+    resp.raise_for_status()
+    return resp
+
+_decoder = json.JSONDecoder()
+
+def iter_json_array(chunks: Iterator[str]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array as its text arrives in chunks."""
+    buf, pos, opened = "", 0, False
+    for chunk in chunks:
+        buf = buf[pos:] + chunk
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                break
+            if not opened:
+                if buf[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                opened = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # element not complete yet; wait for the next chunk
+            rest = buf[end:end + 64].lstrip()
+            if not rest or rest[0] not in ",]":
+                break  # a trailing scalar such as "3." may continue in the next chunk
+            pos = end
+            yield item
+    raise ValueError("Truncated JSON array")
+
+def stream_api(endpoint: str, params: Optional[dict] = None) -> Iterator[Any]:
+    """GET a JSON array endpoint and yield its elements while the body is still downloading."""
+    client = get_client()
+    for attempt in range(MAX_RETRIES + 1):
+        with client.stream("GET", endpoint.lstrip("/"), params=params) as resp:
+            if resp.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                delay = retry_delay(resp, attempt)
+            else:
+                resp.raise_for_status()
+                yield from iter_json_array(resp.iter_text())
+                return
+        time.sleep(delay)
 
 def api(endpoint: str, params: Optional[dict] = None) -> Any:
     """Make authenticated GET request to Sonarr API."""
-    if not BASE_URL or not API_KEY:
-        sys.exit("Error: Set SONARR_URL and SONARR_API_KEY environment variables")
-    url = f"{BASE_URL}/api/v3/{endpoint.lstrip('/')}"
-    resp = httpx.get(url, params=params, headers={"X-Api-Key": API_KEY}, timeout=60)
-    resp.raise_for_status()
-    return resp.json()
+    return request("GET", endpoint, params=params).json()
 
 def api_post(endpoint: str, payload: dict) -> Any:
     """Make authenticated POST request to Sonarr API."""
-    if not BASE_URL or not API_KEY:
-        sys.exit("Error: Set SONARR_URL and SONARR_API_KEY environment variables")
-    url = f"{BASE_URL}/api/v3/{endpoint.lstrip('/')}"
-    resp = httpx.post(url, json=payload, headers={"X-Api-Key": API_KEY}, timeout=60)
-    resp.raise_for_status()
-    return resp.json()
+    return request("POST", endpoint, json=payload).json()
 
 def api_delete(endpoint: str) -> None:
     """Make authenticated DELETE request to Sonarr API."""
-    if not BASE_URL or not API_KEY:
-        sys.exit("Error: Set SONARR_URL and SONARR_API_KEY environment variables")
-    url = f"{BASE_URL}/api/v3/{endpoint.lstrip('/')}"
-    resp = httpx.delete(url, headers={"X-Api-Key": API_KEY}, timeout=60)
-    resp.raise_for_status()
+    request("DELETE", endpoint)
 
-def list_series():
-    """List all series in library."""
-    series = api("series")
-    for s in sorted(series, key=lambda x: x["title"]):
-        status = "Ended" if s.get("ended") else "Continuing"
-        eps = f"{s.get('episodeFileCount', 0)}/{s.get('episodeCount', 0)} eps"
-        print(f"{s['title']} ({s.get('year', '?')}) - {status} - {eps}")
+class SeriesRow:
+    """The few /series fields list prints, without the images, seasons and alternate titles."""
+    __slots__ = ("title", "year", "ended", "files", "episodes")
+
+    def __init__(self, s: dict):
+        stats = s.get("statistics") or {}
+        self.title = s["title"]
+        self.year = s.get("year", "?")
+        self.ended = bool(s.get("ended"))
+        self.files = s.get("episodeFileCount", stats.get("episodeFileCount", 0))
+        self.episodes = s.get("episodeCount", stats.get("episodeCount", 0))
+
+    def __str__(self) -> str:
+        status = "Ended" if self.ended else "Continuing"
+        return f"{self.title} ({self.year}) - {status} - {self.files}/{self.episodes} eps"
+
+def list_series(unsorted: bool = False):
+    """List all series in library, parsing /series as it streams in."""
+    rows = (SeriesRow(s) for s in stream_api("series"))
+    if unsorted:
+        for row in rows:
+            print(row, flush=True)
+        return
+    for row in sorted(rows, key=lambda r: r.title):
+        print(row)
 
 def search_series(term: str):
     """Search for series by name."""
-    results = api("series/lookup", {"term": term})
+    results = lookup_series(term)
     for s in results[:10]:
         print(f"{s['title']} ({s.get('year', '?')}) - TVDB: {s.get('tvdbId', 'N/A')}")
 
@@ -58,8 +182,231 @@ def get_series(series_id: int):
     s = api(f"series/{series_id}")
     print(json.dumps(s, indent=2))
 
+def iter_paged(endpoint: str, params: Optional[dict] = None, page_size: int = 1000) -> Iterator[dict]:
+    """Yield records from a paged endpoint one page at a time."""
+    page = 1
+    while True:
+        data = api(endpoint, {**(params or {}), "page": page, "pageSize": page_size})
+        records = data.get("records", [])
+        yield from records
+        if not records or page * page_size >= data.get("totalRecords", 0):
+            return
+        page += 1
+
+def missing_episodes(monitored: bool = False, aired: bool = False, page_size: int = 1000) -> Iterator[dict]:
+    """Stream wanted/missing episodes, optionally only monitored and already aired."""
+    # Series resources would be embedded in every record; titles come from the library index instead
+    params = {"includeSeries": "false", "sortKey": "airDateUtc", "sortDirection": "ascending"}
+    # Sonarr treats an omitted monitored filter as monitored=true, so unmonitored
+    # episodes need a second pass with monitored=false
+    passes = ["true"] if monitored else ["true", "false"]
+    now = datetime.now(timezone.utc).isoformat()
+    for flag in passes:
+        for e in iter_paged("wanted/missing", {**params, "monitored": flag}, page_size):
+            # Sonarr already leaves unaired episodes out of wanted/missing; this is only a safeguard
+            if aired and not (e.get("airDateUtc") and e["airDateUtc"] <= now):
+                continue
+            yield e
+
+def missing_report(monitored: bool = False, aired: bool = False, episodes: bool = False, page_size: int = 1000):
+    """Print missing episode counts grouped by series and season."""
+    # Only per-season counters are kept, so memory does not grow with episode count
+    counts = {}
+    titles = {}
+    total = 0
+    library = load_library()
+    for e in missing_episodes(monitored, aired, page_size):
+        series_id = e.get("seriesId")
+        if series_id not in titles:
+            record = library["by_id"].get(series_id)
+            titles[series_id] = record["title"] if record else f"Series {series_id}"
+        season = e.get("seasonNumber", 0)
+        seasons = counts.setdefault(series_id, {})
+        seasons[season] = seasons.get(season, 0) + 1
+        total += 1
+        if episodes:
+            air = (e.get("airDateUtc") or "")[:10] or "TBA"
+            print(f"{titles[series_id]} - S{season:02d}E{e.get('episodeNumber', 0):02d} - {e.get('title', '')} ({air})", flush=True)
+    if episodes and total:
+        print()
+    for series_id, seasons in sorted(counts.items(), key=lambda x: titles[x[0]].lower()):
+        detail = ", ".join(f"S{n}: {c}" for n, c in sorted(seasons.items()))
+        print(f"{titles[series_id]} - {sum(seasons.values())} missing ({detail})")
+    print(f"\nTotal: {total} missing episodes in {len(counts)} series")
+
+COMMAND_DONE = {"completed", "failed", "aborted", "cancelled", "orphaned"}
+
+def command_queue_depth() -> int:
+    """Count commands Sonarr has queued or running."""
+    return sum(1 for c in api("command") if c.get("status") in ("queued", "started"))
+
+def search_missing(batch_size: int = 50, max_inflight: int = 3, max_queue: int = 10,
+                   poll: float = 5.0, limit: Optional[int] = None):
+    """Trigger EpisodeSearch for missing monitored, aired episodes in throttled batches."""
+    # Collect ids up front; searching changes wanted/missing and would shift its pages
+    episode_ids = [e["id"] for e in missing_episodes(monitored=True, aired=True)]
+    if limit:
+        episode_ids = episode_ids[:limit]
+    if not episode_ids:
+        print("No missing episodes to search")
+        return
+    batches = [episode_ids[i:i + batch_size] for i in range(0, len(episode_ids), batch_size)]
+    print(f"Searching {len(episode_ids)} episodes in {len(batches)} batches")
+
+    inflight = {}
+    sent = completed = failed = 0
+
+    def reap():
+        nonlocal completed, failed
+        for command_id in list(inflight):
+            status = api(f"command/{command_id}").get("status")
+            if status in COMMAND_DONE:
+                size = inflight.pop(command_id)
+                if status == "completed":
+                    completed += size
+                else:
+                    failed += size
+
+    delay = poll
+    for batch in batches:
+        while True:
+            reap()
+            depth = command_queue_depth()
+            if len(inflight) < max_inflight and depth < max_queue:
+                delay = poll
+                break
+            # Back off further while Sonarr's queue is deep, not just while our own commands run
+            time.sleep(delay)
+            delay = min(delay * 2, 60) if depth >= max_queue else poll
+        command = api_post("command", {"name": "EpisodeSearch", "episodeIds": batch})
+        inflight[command["id"]] = len(batch)
+        sent += len(batch)
+        print(f"Queued {sent}/{len(episode_ids)} (command {command['id']}, queue depth {depth})", flush=True)
+
+    while inflight:
+        time.sleep(poll)
+        reap()
+    print(f"Done: {completed} searched, {failed} failed")
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+class FileColumns:
+    """Episode file attributes stored column-wise, with strings coded through small lookup tables."""
+
+    def __init__(self):
+        self.series = array("i")
+        self.season = array("H")
+        self.size = array("Q")
+        self.resolution = array("H")
+        self.quality = array("H")
+        self.codec = array("H")
+        self.group = array("H")
+        self.labels = {"quality": [], "codec": [], "group": []}
+        self._codes = {"quality": {}, "codec": {}, "group": {}}
+
+    def code(self, column: str, value: Optional[str]) -> int:
+        codes = self._codes[column]
+        value = value or "unknown"
+        if value not in codes:
+            codes[value] = len(codes)
+            self.labels[column].append(value)
+        return codes[value]
+
+    def append(self, row: tuple):
+        series_id, season, size, resolution, quality, codec, group = row
+        self.series.append(series_id)
+        self.season.append(season)
+        self.size.append(size)
+        self.resolution.append(resolution)
+        self.quality.append(self.code("quality", quality))
+        self.codec.append(self.code("codec", codec))
+        self.group.append(self.code("group", group))
+
+def fetch_file_rows(series_id: int) -> list:
+    """Fetch one series' episode files, keeping only the fields FileColumns stores."""
+    rows = []
+    for f in api("episodefile", {"seriesId": series_id}):
+        quality = (f.get("quality") or {}).get("quality") or {}
+        rows.append((
+            f.get("seriesId", series_id),
+            f.get("seasonNumber", 0),
+            f.get("size", 0),
+            quality.get("resolution") or 0,
+            quality.get("name"),
+            (f.get("mediaInfo") or {}).get("videoCodec"),
+            f.get("releaseGroup"),
+        ))
+    return rows
+
+def print_histogram(title: str, labels: list, codes: array, sizes: array, top: int):
+    """Print file count and total size per label, largest first, with a size bar."""
+    counts, totals = [0] * len(labels), [0] * len(labels)
+    for c, size in zip(codes, sizes):
+        counts[c] += 1
+        totals[c] += size
+    order = sorted(range(len(labels)), key=lambda c: -totals[c])[:top]
+    if not order:
+        return
+    peak = totals[order[0]] or 1
+    width = max(len(labels[c]) for c in order)
+    print(f"\n{title}:")
+    for c in order:
+        bar = "#" * max(1, round(30 * totals[c] / peak))
+        print(f"  {labels[c]:<{width}}  {counts[c]:>6} files  {format_size(totals[c]):>10}  {bar}")
+
+def usage_report(top: int = 10, concurrency: int = MAX_CONNECTIONS, by_season: bool = False):
+    """Fan /episodefile out over the library and report storage by series, season, quality, codec and group."""
+    library = load_library()
+    titles = {series_id: r["title"] for series_id, r in library["by_id"].items()}
+    cols = FileColumns()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        # Workers return compact rows, and each future is dropped once consumed
+        futures = {pool.submit(run_step, fetch_file_rows, series_id): series_id for series_id in titles}
+        for future in as_completed(list(futures)):
+            del futures[future]
+            rows, error = future.result()
+            if error:
+                failed += 1
+                continue
+            for row in rows:
+                cols.append(row)
+
+    total = sum(cols.size)
+    print(f"{len(cols.size)} episode files, {format_size(total)} across {len(titles)} series")
+    if failed:
+        print(f"Warning: {failed} series could not be read", file=sys.stderr)
+
+    by_key, low_res = {}, {}
+    for series_id, season, size, resolution in zip(cols.series, cols.season, cols.size, cols.resolution):
+        key = (series_id, season) if by_season else series_id
+        by_key[key] = by_key.get(key, 0) + size
+        if 0 < resolution < 1080:
+            low_res[series_id] = low_res.get(series_id, 0) + 1
+
+    def name(key) -> str:
+        if by_season:
+            return f"{titles.get(key[0], f'Series {key[0]}')} S{key[1]:02d}"
+        return titles.get(key, f"Series {key}")
+
+    print(f"\nLargest {'seasons' if by_season else 'series'}:")
+    for key, size in heapq.nlargest(top, by_key.items(), key=lambda item: item[1]):
+        print(f"  {format_size(size):>10}  {name(key)}")
+    if low_res:
+        print("\nMost SD/720p files:")
+        for series_id, count in heapq.nlargest(top, low_res.items(), key=lambda item: item[1]):
+            print(f"  {count:>6}  {titles.get(series_id, f'Series {series_id}')}")
+    print_histogram("Quality", cols.labels["quality"], cols.quality, cols.size, top)
+    print_histogram("Video codec", cols.labels["codec"], cols.codec, cols.size, top)
+    print_histogram("Release group", cols.labels["group"], cols.group, cols.size, top)
+
+@lru_cache(maxsize=None)
 def get_quality_profiles():
-    """Return quality profiles."""
+    """Return quality profiles (fetched once per process)."""
     return api("qualityprofile")
 
 def resolve_quality_profile_id(quality: str) -> int:
@@ -74,8 +421,9 @@ def resolve_quality_profile_id(quality: str) -> int:
     names = ", ".join(p["name"] for p in profiles)
     sys.exit(f"Error: Unknown quality profile '{quality}'. Available: {names}")
 
+@lru_cache(maxsize=None)
 def get_root_folders():
-    """Return root folders."""
+    """Return root folders (fetched once per process)."""
     return api("rootfolder")
 
 def resolve_root_folder_path(root: Optional[str] = None) -> str:
@@ -90,25 +438,204 @@ def resolve_root_folder_path(root: Optional[str] = None) -> str:
         sys.exit("Error: No root folders configured in Sonarr")
     return folders[0]["path"]
 
+def normalize_title(title: str) -> str:
+    """Lowercase a title and collapse punctuation/whitespace for matching."""
+    title = re.sub(r"['’]", "", title.lower()).replace("&", " and ")
+    # Fold dotted acronyms so "S.H.I.E.L.D." matches "shield"
+    title = re.sub(r"\b(?:[a-z0-9]\.){2,}", lambda m: m.group().replace(".", ""), title)
+    return re.sub(r"[^a-z0-9]+", " ", title).strip()
+
+def trigrams(norm: str) -> set:
+    """Character trigrams of a normalized title, padded so word edges count."""
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleIndex:
+    """Normalized-title and trigram index for ranked fuzzy title lookups."""
+
+    def __init__(self, records: list):
+        self.records = records
+        self.exact: dict = {}
+        self.postings: dict = defaultdict(list)
+        self.sizes: list = []
+        for i, r in enumerate(records):
+            norm = normalize_title(r.get("title", ""))
+            self.exact.setdefault(norm, i)
+            grams = trigrams(norm)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(i)
+
+    def search(self, term: str, limit: int = 5) -> list:
+        """Return up to `limit` (score, record) pairs, best first; exact matches score 1.0."""
+        norm = normalize_title(term)
+        grams = trigrams(norm)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        exact = self.exact.get(norm)
+        scores = {i: 2 * n / (len(grams) + self.sizes[i]) for i, n in shared.items() if i != exact}
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        if exact is not None:
+            ranked = [(exact, 1.0)] + ranked[:limit - 1]
+        return [(round(score, 3), self.records[i]) for i, score in ranked]
+
+def format_candidates(candidates: list) -> str:
+    return "; ".join(f"{r.get('title', 'Unknown')} ({r.get('year', '?')}) [{score:.2f}]" for score, r in candidates)
+
+def best_match(index: TitleIndex, term: str, what: str, fuzzy: bool = True) -> dict:
+    """Pick the exact or (if fuzzy) clearly best fuzzy match, else exit listing ranked candidates."""
+    candidates = index.search(term)
+    if not candidates:
+        sys.exit(f"Error: No {what} matches '{term}'")
+    score, record = candidates[0]
+    runner_up = candidates[1][0] if len(candidates) > 1 else 0.0
+    if score == 1.0:
+        return record
+    if not fuzzy:
+        sys.exit(f"Error: No exact {what} match for '{term}'. Candidates: {format_candidates(candidates)}")
+    if score >= MATCH_MIN_SCORE and score - runner_up >= MATCH_MARGIN:
+        print(f"Matched '{term}' to '{record.get('title')}' (score {score:.2f})", file=sys.stderr)
+        return record
+    sys.exit(f"Error: No confident {what} match for '{term}'. Candidates: {format_candidates(candidates)}")
+
+def index_library(records: list, fetched: float) -> dict:
+    """Build id, tvdbId and normalized-title lookups over library records."""
+    return {
+        "fetched": fetched,
+        "by_id": {r["id"]: r for r in records},
+        "by_tvdb": {r["tvdbId"]: r for r in records if r.get("tvdbId")},
+        "by_title": {normalize_title(r["title"]): r for r in records},
+    }
+
+def save_library(library: dict):
+    """Persist the library index to disk."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / "library.json"
+    tmp = path.with_suffix(".tmp")
+    data = {"url": BASE_URL, "fetched": library["fetched"], "series": list(library["by_id"].values())}
+    tmp.write_text(json.dumps(data, separators=(",", ":")))
+    tmp.replace(path)
+
+def load_library(refresh: bool = False) -> dict:
+    """Return the library index, from disk while fresh, else re-downloaded from /series."""
+    global _library
+    if _library is not None and not refresh:
+        return _library
+    path = CACHE_DIR / "library.json"
+    if not refresh and path.exists():
+        data = json.loads(path.read_text())
+        if data.get("url") == BASE_URL and time.time() - data.get("fetched", 0) < LIBRARY_TTL:
+            _library = index_library(data["series"], data["fetched"])
+            return _library
+    records = [
+        {"id": s["id"], "tvdbId": s.get("tvdbId"), "title": s.get("title", ""), "year": s.get("year")}
+        for s in stream_api("series")
+    ]
+    _library = index_library(records, time.time())
+    save_library(_library)
+    return _library
+
+def library_titles() -> TitleIndex:
+    """Return the fuzzy title index over the library, building it on first use."""
+    library = load_library()
+    if "titles" not in library:
+        library["titles"] = TitleIndex(list(library["by_id"].values()))
+    return library["titles"]
+
+def library_add(series: dict):
+    """Record a newly added series in the library index."""
+    library = load_library()
+    library.pop("titles", None)
+    record = {"id": series["id"], "tvdbId": series.get("tvdbId"), "title": series.get("title", ""), "year": series.get("year")}
+    library["by_id"][record["id"]] = record
+    if record["tvdbId"]:
+        library["by_tvdb"][record["tvdbId"]] = record
+    library["by_title"][normalize_title(record["title"])] = record
+    save_library(library)
+
+def library_remove(series_id: int):
+    """Drop a deleted series from the library index."""
+    library = load_library()
+    record = library["by_id"].pop(series_id, None)
+    if record:
+        library.pop("titles", None)
+        library["by_tvdb"].pop(record.get("tvdbId"), None)
+        library["by_title"].pop(normalize_title(record["title"]), None)
+        save_library(library)
+
+def load_lookups() -> dict:
+    """Return the persistent series/lookup cache, starting empty for a new server."""
+    global _lookups
+    if _lookups is None:
+        path = CACHE_DIR / "lookup.json"
+        data = json.loads(path.read_text()) if path.exists() else {}
+        if data.get("url") != BASE_URL:
+            data = {"url": BASE_URL, "hits": 0, "misses": 0, "entries": {}}
+        _lookups = data
+    return _lookups
+
+def save_lookups():
+    """Persist the lookup cache to disk."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / "lookup.json"
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(_lookups, separators=(",", ":")))
+    tmp.replace(path)
+
+def lookup_series(term: str) -> list:
+    """Return series/lookup results for a term, reusing a fresh cached answer for the same normalized term."""
+    key = normalize_title(term)
+    with _lookups_lock:
+        lookups = load_lookups()
+        entry = lookups["entries"].pop(key, None)
+        if entry and time.time() - entry["fetched"] < LOOKUP_TTL:
+            lookups["entries"][key] = entry  # re-insert as most recently used
+            lookups["hits"] += 1
+            save_lookups()
+            return entry["results"]
+        lookups["misses"] += 1
+    results = [{k: r[k] for k in LOOKUP_FIELDS if k in r} for r in api("series/lookup", {"term": term})]
+    with _lookups_lock:
+        entries = lookups["entries"]
+        entries[key] = {"fetched": time.time(), "results": results}
+        while len(entries) > LOOKUP_MAX:
+            del entries[next(iter(entries))]  # least recently used first
+        save_lookups()
+    return results
+
+def lookup_cache_stats(clear: bool = False):
+    """Print lookup cache size and hit/miss counters, optionally clearing it."""
+    global _lookups
+    lookups = load_lookups()
+    total = lookups["hits"] + lookups["misses"]
+    rate = f"{lookups['hits'] / total:.0%}" if total else "n/a"
+    print(f"Entries: {len(lookups['entries'])}/{LOOKUP_MAX} (TTL {LOOKUP_TTL}s)")
+    print(f"Hits: {lookups['hits']}  Misses: {lookups['misses']}  Hit rate: {rate}")
+    if clear:
+        (CACHE_DIR / "lookup.json").unlink(missing_ok=True)
+        _lookups = None
+        print("Cleared")
+
+def find_library_series(title: str, fuzzy: bool = True) -> dict:
+    """Find a library series by exact or confident fuzzy title match, else exit with candidates."""
+    return best_match(library_titles(), title, "library series", fuzzy)
+
 def find_existing_series(tvdb_id: int, title: str) -> bool:
-    series = api("series")
-    for s in series:
-        if s.get("tvdbId") == tvdb_id:
-            return True
-        if s.get("title", "").lower() == title.lower():
-            return True
-    return False
+    library = load_library()
+    return tvdb_id in library["by_tvdb"] or normalize_title(title) in library["by_title"]
 
 def pick_best_match(results: list, term: str) -> dict:
-    term_lower = term.lower()
-    for s in results:
-        if s.get("title", "").lower() == term_lower:
-            return s
-    top = "; ".join(f"{r.get('title', 'Unknown')} ({r.get('year', '?')})" for r in results[:5])
-    sys.exit(f"Error: No exact title match for '{term}'. Top results: {top}")
+    return best_match(TitleIndex(results), term, "lookup result")
 
 def add_series(term: str, quality: str, root: Optional[str] = None, search: bool = True):
-    results = api("series/lookup", {"term": term})
+    # Lookup, library index, profiles and root folders are independent; fetch them together
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        lookup = pool.submit(lookup_series, term)
+        prerequisites = [pool.submit(load_library), pool.submit(get_quality_profiles), pool.submit(get_root_folders)]
+        results = lookup.result()
+        for future in prerequisites:
+            future.result()
     if not results:
         sys.exit(f"Error: No series found for '{term}'")
     series = pick_best_match(results, term)
@@ -120,56 +647,261 @@ def add_series(term: str, quality: str, root: Optional[str] = None, search: bool
         print(f"Already in library: {title}")
         return
 
-    quality_id = resolve_quality_profile_id(quality)
-    root_path = resolve_root_folder_path(root)
-    payload = {
-        "title": title,
-        "tvdbId": tvdb_id,
-        "qualityProfileId": quality_id,
-        "rootFolderPath": root_path,
+    payload = build_add_payload(series, quality, root, search)
+    added = post_series(payload)
+    if added is None:
+        # Added outside this tool since the index was built
+        load_library(refresh=True)
+        print(f"Already in library: {title}")
+        return
+    library_add(added)
+    print(f"Added: {added.get('title', title)}")
+
+def post_series(payload: dict) -> Optional[dict]:
+    """POST a new series, returning None if Sonarr reports it was already added."""
+    try:
+        return api_post("series", payload)
+    except httpx.HTTPStatusError as e:
+        body = e.response.text
+        if e.response.status_code == 400 and ("SeriesExistsValidator" in body or "already been added" in body):
+            return None
+        raise
+
+def build_add_payload(series: dict, quality: str, root: Optional[str] = None, search: bool = True) -> dict:
+    """Build the POST /series body for a lookup result."""
+    return {
+        "title": series.get("title"),
+        "tvdbId": series.get("tvdbId"),
+        "qualityProfileId": resolve_quality_profile_id(quality),
+        "rootFolderPath": resolve_root_folder_path(root),
         "monitored": True,
         "seasonFolder": True,
         "seriesType": series.get("seriesType", "standard"),
         "addOptions": {"searchForMissingEpisodes": bool(search)},
     }
-    added = api_post("series", payload)
-    print(f"Added: {added.get('title', title)}")
 
-def delete_series(term: str):
-    series_list = api("series")
-    match = None
-    term_lower = term.lower()
-    for s in series_list:
-        if s.get("title", "").lower() == term_lower:
-            match = s
-            break
-    if not match:
-        sys.exit(f"Error: Series not found in library: '{term}'")
+class RateLimiter:
+    """Space calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+def run_step(fn, *args) -> tuple:
+    """Run one bulk step, returning (result, error message) instead of exiting."""
+    try:
+        return fn(*args), None
+    except SystemExit as e:
+        return None, str(e.code).removeprefix("Error: ")
+    except httpx.HTTPError as e:
+        return None, str(e)
+
+def parse_bulk_lines(lines: list, quality: Optional[str], root: Optional[str]) -> list:
+    """Parse 'term [| quality [| root]]' lines, skipping blanks and # comments."""
+    entries = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [p.strip() for p in line.split("|")]
+        entries.append({
+            "line": number,
+            "term": parts[0],
+            "quality": (parts[1] if len(parts) > 1 and parts[1] else quality),
+            "root": (parts[2] if len(parts) > 2 and parts[2] else root),
+        })
+    return entries
+
+def bulk_add(source: str, quality: Optional[str], root: Optional[str] = None, search: bool = True,
+             concurrency: int = 4, rate: float = 2.0):
+    """Add every series listed in a file (or stdin with '-'), resuming a previous run."""
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+        state_key = hashlib.sha1("\n".join(lines).encode()).hexdigest()
+    else:
+        lines = Path(source).read_text().splitlines()
+        state_key = hashlib.sha1(str(Path(source).resolve()).encode()).hexdigest()
+    entries = parse_bulk_lines(lines, quality, root)
+    state_path = CACHE_DIR / "bulk" / f"{state_key}.json"
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+
+    def record(entry: dict, status: str, title: str = "", message: str = ""):
+        state[str(entry["line"])] = {"term": entry["term"], "status": status, "title": title, "message": message}
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        tmp.replace(state_path)
+
+    pending = []
+    for entry in entries:
+        previous = state.get(str(entry["line"]))
+        if previous and previous["term"] == entry["term"] and previous["status"] in ("added", "exists"):
+            continue
+        pending.append(entry)
+
+    # One library snapshot and profile/root lists for the whole batch
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        for future in [pool.submit(load_library), pool.submit(get_quality_profiles), pool.submit(get_root_folders)]:
+            future.result()
+
+    limiter = RateLimiter(rate)
+    claimed = set()
+    stale = False
+
+    def post(payload):
+        limiter.wait()
+        return run_step(post_series, payload)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as lookups, ThreadPoolExecutor(max_workers=concurrency) as posts:
+        lookup_futures = {lookups.submit(run_step, lookup_series, e["term"]): e for e in pending}
+        post_futures = {}
+        for future in as_completed(lookup_futures):
+            entry = lookup_futures[future]
+            results, error = future.result()
+            if error:
+                record(entry, "error", message=error)
+                continue
+            if not results:
+                record(entry, "error", message=f"No series found for '{entry['term']}'")
+                continue
+            series, error = run_step(pick_best_match, results, entry["term"])
+            if error:
+                record(entry, "error", message=error)
+                continue
+            tvdb_id = series.get("tvdbId")
+            title = series.get("title", entry["term"])
+            if not tvdb_id:
+                record(entry, "error", title, f"Missing TVDB ID for '{title}'")
+                continue
+            if tvdb_id in claimed or find_existing_series(tvdb_id, title):
+                record(entry, "exists", title)
+                continue
+            if not entry["quality"]:
+                record(entry, "error", title, "No quality profile given (use --quality or 'term | quality')")
+                continue
+            payload, error = run_step(build_add_payload, series, entry["quality"], entry["root"], search)
+            if error:
+                record(entry, "error", title, error)
+                continue
+            claimed.add(tvdb_id)
+            post_futures[posts.submit(post, payload)] = (entry, title)
+
+        for future in as_completed(post_futures):
+            entry, title = post_futures[future]
+            added, error = future.result()
+            if error:
+                record(entry, "error", title, error)
+                continue
+            if added is None:
+                stale = True
+                record(entry, "exists", title)
+                continue
+            library_add(added)
+            record(entry, "added", added.get("title", title))
+
+    if stale:
+        # Some series were added outside this tool since the index was built
+        load_library(refresh=True)
+
+    counts = {}
+    for entry in entries:
+        result = state.get(str(entry["line"]), {"status": "error", "title": "", "message": "not processed"})
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        detail = result["message"] or (result["title"] if result["title"] != entry["term"] else "")
+        print(f"{entry['line']:>4}  {result['status']:<7}  {entry['term']}" + (f"  ->  {detail}" if detail else ""))
+    print("\n" + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    if counts.get("error"):
+        sys.exit(1)
+
+def delete_series(term: str, yes: bool = False):
+    # Deleting is destructive: only act on a fuzzy match when explicitly confirmed
+    match = find_library_series(term, fuzzy=yes)
     series_id = match.get("id")
-    api_delete(f"series/{series_id}?deleteFiles=false&addImportListExclusion=false")
+    try:
+        api_delete(f"series/{series_id}?deleteFiles=false&addImportListExclusion=false")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 404:
+            raise
+        # Deleted outside this tool since the index was built
+        library_remove(series_id)
+        sys.exit(f"Error: Series not found in library: '{term}'")
+    library_remove(series_id)
     print(f"Deleted: {match.get('title')}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: sonarr.py <command> [args]")
-        print("Commands: list, search <term>, get <id>, add <term> --quality <name|id> [--root <path>] [--no-search], delete <term>")
+        print("Commands: list [--unsorted], search <term>, get <id|title>, add <term> --quality <name|id> [--root <path>] [--no-search], delete <term> [--yes]")
+        print("          missing [--monitored] [--aired] [--episodes] [--page-size N]")
+        print("          lookup-cache [--clear]")
+        print("          usage [--top N] [--concurrency N] [--by-season]")
+        print("          search-missing [--batch-size N] [--max-inflight N] [--max-queue N] [--poll SECONDS] [--limit N]")
+        print("          add --from-file <path|-> [--quality <name|id>] [--root <path>] [--no-search] [--concurrency N] [--rate N]")
         sys.exit(1)
 
     cmd = sys.argv[1]
     if cmd == "list":
-        list_series()
+        list_series(unsorted="--unsorted" in sys.argv[2:])
+    elif cmd == "missing":
+        args = sys.argv[2:]
+        page_size = int(args[args.index("--page-size") + 1]) if "--page-size" in args else 1000
+        missing_report(
+            monitored="--monitored" in args,
+            aired="--aired" in args,
+            episodes="--episodes" in args,
+            page_size=page_size,
+        )
+    elif cmd == "usage":
+        args = sys.argv[2:]
+        usage_report(
+            top=int(args[args.index("--top") + 1]) if "--top" in args else 10,
+            concurrency=int(args[args.index("--concurrency") + 1]) if "--concurrency" in args else MAX_CONNECTIONS,
+            by_season="--by-season" in args,
+        )
+    elif cmd == "lookup-cache":
+        lookup_cache_stats(clear="--clear" in sys.argv[2:])
+    elif cmd == "search-missing":
+        args = sys.argv[2:]
+
+        def flag(name: str, default: Any, cast=int) -> Any:
+            return cast(args[args.index(name) + 1]) if name in args else default
+
+        search_missing(
+            batch_size=flag("--batch-size", 50),
+            max_inflight=flag("--max-inflight", 3),
+            max_queue=flag("--max-queue", 10),
+            poll=flag("--poll", 5.0, float),
+            limit=flag("--limit", None),
+        )
     elif cmd == "search" and len(sys.argv) > 2:
         search_series(" ".join(sys.argv[2:]))
     elif cmd == "get" and len(sys.argv) > 2:
-        get_series(int(sys.argv[2]))
+        ref = " ".join(sys.argv[2:])
+        if ref.isdigit():
+            get_series(int(ref))
+        else:
+            match = find_library_series(ref)
+            get_series(match["id"])
     elif cmd == "add" and len(sys.argv) > 2:
         args = sys.argv[2:]
-        if "--quality" not in args:
+        if "--quality" not in args and "--from-file" not in args:
             sys.exit("Error: add requires --quality <name|id>")
         term_parts = []
         quality = None
         root = None
         search = True
+        from_file = None
+        concurrency = 4
+        rate = 2.0
         i = 0
         while i < len(args):
             arg = args[i]
@@ -185,8 +917,23 @@ if __name__ == "__main__":
                 search = False
                 i += 1
                 continue
+            if arg == "--from-file" and i + 1 < len(args):
+                from_file = args[i + 1]
+                i += 2
+                continue
+            if arg == "--concurrency" and i + 1 < len(args):
+                concurrency = max(1, int(args[i + 1]))
+                i += 2
+                continue
+            if arg == "--rate" and i + 1 < len(args):
+                rate = float(args[i + 1])
+                i += 2
+                continue
             term_parts.append(arg)
             i += 1
+        if from_file:
+            bulk_add(from_file, quality, root=root, search=search, concurrency=concurrency, rate=rate)
+            sys.exit(0)
         term = " ".join(term_parts).strip()
         if not term:
             sys.exit("Error: add requires a series term")
@@ -194,7 +941,8 @@ if __name__ == "__main__":
             sys.exit("Error: add requires --quality <name|id>")
         add_series(term, quality, root=root, search=search)
     elif cmd == "delete" and len(sys.argv) > 2:
-        delete_series(" ".join(sys.argv[2:]))
+        args = sys.argv[2:]
+        delete_series(" ".join(a for a in args if a != "--yes"), yes="--yes" in args)
     else:
         print(f"Unknown command: {cmd}")
         sys.exit(1)
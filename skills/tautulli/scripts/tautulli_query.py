@@ -10,6 +10,16 @@ Environment variables required:
     TAUTULLI_URL: Base URL (e.g., http://localhost:8181)
     TAUTULLI_API_KEY: API key from Tautulli settings
 
+Optional:
+    TAUTULLI_INSTANCES: Comma-separated instance names for --all-servers; each
+        needs TAUTULLI_<NAME>_URL and TAUTULLI_<NAME>_API_KEY
+    TAUTULLI_CACHE_DIR: Local data directory (default: ~/.cache/tautulli)
+    TAUTULLI_TIMEOUT: Request timeout in seconds (default: 30)
+    TAUTULLI_RETRIES: Retries for failed requests (default: 3)
+    TAUTULLI_POOL_SIZE: Max pooled keep-alive connections (default: 10)
+    TAUTULLI_CACHE_MAX_MB: Response cache size limit (default: 50)
+    TAUTULLI_METADATA_CACHE_MAX: Max titles kept in the --enrich metadata cache (default: 100000)
+
 Usage:
     uv run tautulli_query.py <command> [options]
 
@@ -21,18 +31,38 @@ Commands:
     popular         Most watched content
     stats           Server statistics
     user-history    History for specific user
+    users-history   Summary for many users, fetched in parallel
+    concurrency     Concurrent stream curve computed from history
+    trends          Exact play/watch-time trends from server-side graphs
     search          Search history
+    export          Stream full history as NDJSON, CSV, parquet or arrow
+    sync            Update local SQLite history mirror
 """
 
 import argparse
+import csv
+import hashlib
+import heapq
 import json
 import os
+import queue
+import re
+import sqlite3
 import sys
+import threading
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from itertools import chain, islice
+from pathlib import Path
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 from tabulate import tabulate
+from urllib3.util.retry import Retry
 
 
 def get_config() -> tuple[str, str]:
@@ -47,24 +77,548 @@ def get_config() -> tuple[str, str]:
     return url.rstrip("/"), api_key
 
 
+def get_instances() -> dict[str, tuple[str, str]]:
+    """Get named Tautulli instances (URL and API key) from environment."""
+    names = [n.strip() for n in os.environ.get("TAUTULLI_INSTANCES", "").split(",") if n.strip()]
+    if not names:
+        return {"default": get_config()}
+
+    instances = {}
+    for name in names:
+        env_name = re.sub(r"\W", "_", name).upper()
+        prefix = f"TAUTULLI_{env_name}_"
+        url = os.environ.get(f"{prefix}URL")
+        api_key = os.environ.get(f"{prefix}API_KEY")
+        if not url or not api_key:
+            print(f"Error: {prefix}URL and {prefix}API_KEY environment variables required", file=sys.stderr)
+            sys.exit(1)
+        instances[name] = (url.rstrip("/"), api_key)
+    return instances
+
+
+def get_cache_dir() -> Path:
+    """Get local data directory, creating it if needed."""
+    path = Path(os.environ.get("TAUTULLI_CACHE_DIR") or Path.home() / ".cache" / "tautulli")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# Seconds to cache each command's response; commands not listed are never cached
+CACHE_TTLS = {
+    "get_home_stats": 600,
+    "get_plays_by_date": 600,
+    "get_plays_by_dayofweek": 600,
+    "get_plays_by_hourofday": 600,
+    "get_plays_by_stream_type": 600,
+    "get_plays_by_top_10_users": 600,
+    "get_plays_by_top_10_platforms": 600,
+    "get_library_watch_time_stats": 600,
+    "get_users": 3600,
+    "get_libraries": 3600,
+    "get_activity": 0,
+    "get_history": 0,
+}
+
+# --enrich keeps only the extracted fields per rating_key, not whole get_metadata payloads
+METADATA_TTL = 7 * 86400
+
+
+class ResponseCache:
+    """On-disk API response cache with per-entry expiry and LRU eviction."""
+
+    def __init__(self, path: Path, max_bytes: int, max_metadata: int = 100000):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed);
+            CREATE TABLE IF NOT EXISTS metadata (
+                url TEXT NOT NULL,
+                rating_key TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                expires INTEGER NOT NULL,
+                PRIMARY KEY (url, rating_key)
+            );
+        """)
+        # The metadata table has its own entry budget, trimmed once per run
+        self.conn.execute("DELETE FROM metadata WHERE expires <= ?", (time.time(),))
+        self.conn.execute(
+            "DELETE FROM metadata WHERE rowid IN (SELECT rowid FROM metadata ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (max_metadata,),
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(url: str, cmd: str, params: dict[str, Any]) -> str:
+        """Build a cache key from the server, command and normalized params."""
+        normalized = {k: str(v) for k, v in params.items() if v is not None and k != "apikey"}
+        raw = json.dumps([url, cmd, normalized], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        """Return a cached response, or None if missing or expired."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM responses WHERE key = ? AND expires > ?", (key, now)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, data: Any, ttl: int):
+        """Store a response and evict expired, then least recently used, entries."""
+        raw = json.dumps(data, separators=(",", ":"))
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, raw, len(raw), int(now + ttl), now),
+            )
+            self.conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                evict = []
+                for old_key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                    if total <= self.max_bytes:
+                        break
+                    evict.append((old_key,))
+                    total -= size
+                self.conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+            self.conn.commit()
+
+    def get_fields(self, url: str, rating_key: str) -> dict[str, Any] | None:
+        """Return cached enrichment fields for a rating_key, or None if missing or expired."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fields FROM metadata WHERE url = ? AND rating_key = ? AND expires > ?",
+                (url, rating_key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_fields(self, url: str, rating_key: str, fields: dict[str, Any], ttl: int):
+        """Store the enrichment fields for a rating_key."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                (url, rating_key, json.dumps(fields, separators=(",", ":")), int(time.time() + ttl)),
+            )
+            self.conn.commit()
+
+
+class TautulliAPIError(Exception):
+    """Tautulli answered a request with a non-success result."""
+
+
+class TautulliClient:
+    """Tautulli API client with a pooled keep-alive session."""
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        timeout: float = 30,
+        retries: int = 3,
+        pool_size: int = 10,
+        cache: ResponseCache | None = None,
+        refresh: bool = False,
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.cache = cache
+        self.refresh = refresh
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def call(self, cmd: str, **params) -> dict[str, Any]:
+        """Make Tautulli API call, serving cacheable commands from the response cache."""
+        params = {k: v for k, v in params.items() if v is not None}
+
+        ttl = CACHE_TTLS.get(cmd, 0) if self.cache else 0
+        if ttl:
+            key = ResponseCache.make_key(self.url, cmd, params)
+            if not self.refresh:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+
+        params["apikey"] = self.api_key
+        params["cmd"] = cmd
+
+        response = self.session.get(f"{self.url}/api/v2", params=params, timeout=self.timeout)
+        response.raise_for_status()
+
+        data = response.json()
+        if data.get("response", {}).get("result") != "success":
+            raise TautulliAPIError(data.get("response", {}).get("message", "Unknown error"))
+
+        result = data.get("response", {}).get("data", {})
+        if ttl:
+            self.cache.put(key, result, ttl)
+        return result
+
+
+_clients: dict[str, TautulliClient] = {}
+_clients_lock = threading.Lock()
+_client_options: dict[str, Any] = {"cache": True, "refresh": False}
+
+
+def configure_client(**options):
+    """Set options used when the shared client is created."""
+    _client_options.update(options)
+
+
+def get_client(instance: str | None = None) -> TautulliClient:
+    """Get the shared client for an instance (default: TAUTULLI_URL), creating it on first use."""
+    key = instance or "default"
+    if key in _clients:
+        return _clients[key]
+    # Worker threads (e.g. enrich lookups) may ask at once; only one may build the client
+    with _clients_lock:
+        if key not in _clients:
+            url, api_key = get_instances()[instance] if instance else get_config()
+            cache = None
+            if _client_options["cache"]:
+                max_bytes = int(float(os.environ.get("TAUTULLI_CACHE_MAX_MB", 50)) * 1024 * 1024)
+                max_metadata = int(os.environ.get("TAUTULLI_METADATA_CACHE_MAX", 100000))
+                cache = ResponseCache(get_cache_dir() / "responses.db", max_bytes, max_metadata)
+            _clients[key] = TautulliClient(
+                url,
+                api_key,
+                timeout=float(os.environ.get("TAUTULLI_TIMEOUT", 30)),
+                retries=int(os.environ.get("TAUTULLI_RETRIES", 3)),
+                pool_size=int(os.environ.get("TAUTULLI_POOL_SIZE", 10)),
+                cache=cache,
+                refresh=_client_options["refresh"],
+            )
+    return _clients[key]
+
+
 def api_call(cmd: str, **params) -> dict[str, Any]:
-    """Make Tautulli API call."""
-    url, api_key = get_config()
+    """Make Tautulli API call through the shared client."""
+    return get_client().call(cmd, **params)
+
+
+def fan_out(cmd: str, **params) -> dict[str, Any]:
+    """Make the same API call on every instance concurrently, keyed by instance name."""
+    clients = {name: get_client(name) for name in get_instances()}
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        futures = {name: pool.submit(client.call, cmd, **params) for name, client in clients.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def iter_history(
+    page_size: int = 1000, limit: int | None = None, instance: str | None = None, **params
+) -> Iterator[dict[str, Any]]:
+    """Yield get_history records one at a time, paging with start/length windows."""
+    client = get_client(instance)
+    start = 0
+    yielded = 0
+    while limit is None or yielded < limit:
+        length = page_size if limit is None else min(page_size, limit - yielded)
+        data = client.call("get_history", start=start, length=length, **params)
+        page = data.get("data", [])
+        for r in page:
+            yield r
+        yielded += len(page)
+        if len(page) < length:
+            return
+        start += len(page)
+
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    row_id INTEGER PRIMARY KEY,
+    reference_id INTEGER,
+    started INTEGER NOT NULL,
+    stopped INTEGER,
+    duration INTEGER,
+    user TEXT,
+    media_type TEXT,
+    rating_key INTEGER,
+    full_title TEXT,
+    transcode_decision TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_user_started ON history (user, started);
+CREATE INDEX IF NOT EXISTS idx_history_started ON history (started);
+CREATE INDEX IF NOT EXISTS idx_history_media_type_started ON history (media_type, started);
+CREATE INDEX IF NOT EXISTS idx_history_rating_key ON history (rating_key);
+CREATE TABLE IF NOT EXISTS sync_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_reference_id INTEGER NOT NULL,
+    last_started INTEGER NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+"""
 
-    params = {k: v for k, v in params.items() if v is not None}
-    params["apikey"] = api_key
-    params["cmd"] = cmd
+# Full-text index over searchable history fields, keyed by history.row_id
+FTS_FIELDS = ["full_title", "grandparent_title", "user", "platform", "player"]
+FTS_WEIGHTS = "10.0, 5.0, 2.0, 1.0, 1.0"
 
-    response = requests.get(f"{url}/api/v2", params=params, timeout=30)
-    response.raise_for_status()
 
-    data = response.json()
-    if data.get("response", {}).get("result") != "success":
-        msg = data.get("response", {}).get("message", "Unknown error")
-        print(f"API Error: {msg}", file=sys.stderr)
+def open_history_db(must_exist: bool = False) -> sqlite3.Connection:
+    """Open the local history mirror."""
+    path = get_cache_dir() / "history.db"
+    if must_exist and not path.exists():
+        print("Error: No local history mirror. Run 'sync' first.", file=sys.stderr)
         sys.exit(1)
-
-    return data.get("response", {}).get("data", {})
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(HISTORY_SCHEMA)
+
+    if not has_fts(conn):
+        try:
+            conn.execute(f"CREATE VIRTUAL TABLE history_fts USING fts5({', '.join(FTS_FIELDS)}, tokenize='unicode61')")
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE
+            return conn
+        # Index rows synced before the full-text table existed
+        conn.create_function("fts_text", 1, fts_text, deterministic=True)
+        columns = ", ".join(f"fts_text(json_extract(data, '$.{f}'))" for f in FTS_FIELDS)
+        conn.execute(f"INSERT INTO history_fts (rowid, {', '.join(FTS_FIELDS)}) SELECT row_id, {columns} FROM history")
+        conn.commit()
+    return conn
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    """Check whether the mirror has a full-text index."""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'history_fts'").fetchone()
+    return row is not None
+
+
+def store_history(conn: sqlite3.Connection, records: list[dict[str, Any]]):
+    """Upsert get_history records into the mirror and its full-text index."""
+    rows = [history_row(r) for r in records]
+    conn.executemany("INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    if has_fts(conn):
+        conn.executemany("DELETE FROM history_fts WHERE rowid = ?", [(row[0],) for row in rows])
+        conn.executemany(
+            f"INSERT INTO history_fts (rowid, {', '.join(FTS_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)",
+            [(row[0], *(fts_text(r.get(f)) for f in FTS_FIELDS)) for row, r in zip(rows, records)],
+        )
+
+
+def fts_text(value: Any) -> str | None:
+    """Normalize text for indexing, folding dotted acronyms (S.H.I.E.L.D. -> SHIELD)."""
+    if value is None:
+        return None
+    return re.sub(r"\b(\w)\.(?=\w\b)", r"\1", str(value))
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every term as a prefix."""
+    terms = re.findall(r"\w+", fts_text(text))
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def history_row(r: dict[str, Any]) -> tuple:
+    """Convert a get_history record to a history table row."""
+    return (
+        int(r.get("row_id") or r.get("id")),
+        int(r.get("reference_id") or 0),
+        int(r.get("started") or 0),
+        int(r.get("stopped") or 0),
+        int(r.get("duration") or 0),
+        r.get("user"),
+        r.get("media_type"),
+        int(r["rating_key"]) if r.get("rating_key") else None,
+        r.get("full_title"),
+        r.get("transcode_decision"),
+        json.dumps(r, separators=(",", ":")),
+    )
+
+
+def local_history(
+    length: int,
+    start_date: str | None = None,
+    user: str | None = None,
+    media_type: str | None = None,
+    search: str | None = None,
+) -> list[dict[str, Any]]:
+    """Query the local history mirror with get_history-style filters."""
+    conn = open_history_db(must_exist=True)
+    where, values = [], []
+    sql = "SELECT h.data FROM history h"
+    order = "h.started DESC"
+
+    if search and has_fts(conn) and fts_query(search):
+        # Ranked multi-term prefix match, title hits weighted above user/player
+        sql += " JOIN history_fts f ON f.rowid = h.row_id"
+        where.append("history_fts MATCH ?")
+        values.append(fts_query(search))
+        order = f"bm25(history_fts, {FTS_WEIGHTS}), h.started DESC"
+    elif search:
+        where.append("(h.full_title LIKE ? OR h.user LIKE ?)")
+        values.extend([f"%{search}%"] * 2)
+
+    if start_date:
+        where.append("h.started >= ?")
+        values.append(int(datetime.strptime(start_date, "%Y-%m-%d").timestamp()))
+
+    if user:
+        where.append("h.user = ?")
+        values.append(user)
+
+    if media_type:
+        where.append("h.media_type = ?")
+        values.append(media_type)
+
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {order} LIMIT ?"
+    values.append(length)
+
+    rows = conn.execute(sql, values).fetchall()
+    conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+
+def get_history_records(local: bool = False, **params) -> list[dict[str, Any]]:
+    """Get history records from the local mirror or the API."""
+    if local:
+        return local_history(**params)
+    return api_call("get_history", **params).get("data", [])
+
+
+def stream_history_records(
+    local: bool = False, all_servers: bool = False, length: int = 25, **params
+) -> Iterator[dict[str, Any]]:
+    """Yield history records from the local mirror, or page them from the API as they arrive."""
+    if local:
+        return iter(local_history(length=length, **params))
+    if all_servers:
+        return merge_history(length, **params)
+    return iter_history(page_size=min(length, 1000), limit=length, **params)
+
+
+def prefetch(records: Iterator[Any], maxsize: int) -> Iterator[Any]:
+    """Run an iterator in a background thread, buffering at most maxsize items ahead."""
+    done = object()
+    buffer = queue.Queue(maxsize=maxsize)
+
+    def produce():
+        try:
+            for item in records:
+                buffer.put(item)
+        except BaseException as e:  # re-raised in the consumer
+            buffer.put(e)
+        buffer.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while (item := buffer.get()) is not done:
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def merge_history(length: int, **params) -> Iterator[dict[str, Any]]:
+    """K-way merge of every instance's history, newest first, tagged with its server."""
+    page_size = min(length, 1000)
+
+    def tagged(name):
+        for r in iter_history(page_size=page_size, limit=length, instance=name, **params):
+            r["server"] = name
+            yield r
+
+    streams = [prefetch(tagged(name), page_size) for name in get_instances()]
+    merged = heapq.merge(*streams, key=lambda r: int(r.get("started") or 0), reverse=True)
+    return islice(merged, length)
+
+
+# Media fields joined onto history records by --enrich, with their export column types
+ENRICH_TYPES = {
+    "genres": "dictionary",
+    "video_resolution": "dictionary",
+    "video_codec": "dictionary",
+    "audio_codec": "dictionary",
+    "container": "dictionary",
+    "bitrate": "int32",
+    "file_size": "int64",
+}
+
+
+def get_metadata_fields(instance: str | None, rating_key: str) -> dict[str, Any]:
+    """Fetch the enrichment fields for one rating_key, cached on disk for METADATA_TTL."""
+    client = get_client(instance)
+    rating_key = str(rating_key)
+    if client.cache and not client.refresh:
+        cached = client.cache.get_fields(client.url, rating_key)
+        if cached is not None:
+            return cached
+    try:
+        meta = client.call("get_metadata", rating_key=rating_key) or {}
+    except (requests.RequestException, TautulliAPIError):
+        # e.g. the item was removed from Plex; leave the columns empty
+        return {}
+    media = (meta.get("media_info") or [{}])[0]
+    part = (media.get("parts") or [{}])[0]
+    fields = {
+        "genres": ", ".join(meta.get("genres") or []) or None,
+        "video_resolution": media.get("video_full_resolution") or media.get("video_resolution"),
+        "video_codec": media.get("video_codec"),
+        "audio_codec": media.get("audio_codec"),
+        "container": media.get("container"),
+        "bitrate": media.get("bitrate"),
+        "file_size": part.get("file_size"),
+    }
+    if client.cache:
+        client.cache.put_fields(client.url, rating_key, fields, METADATA_TTL)
+    return fields
+
+
+def enrich_records(
+    records: Iterable[dict[str, Any]], workers: int = 8, chunk_size: int = 1000
+) -> Iterator[dict[str, Any]]:
+    """Join media metadata onto streamed records, fetching each unique rating_key once."""
+    records = iter(records)
+    fields_by_key = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for chunk in iter(lambda: list(islice(records, chunk_size)), []):
+            keys = {(r.get("server"), str(r["rating_key"])) for r in chunk if r.get("rating_key")}
+            keys -= fields_by_key.keys()
+            fields_by_key.update(zip(keys, pool.map(lambda key: get_metadata_fields(*key), keys)))
+            for r in chunk:
+                yield {**r, **fields_by_key.get((r.get("server"), str(r.get("rating_key"))), {})}
+
+
+# Results up to this many rows are laid out by tabulate; larger ones are streamed
+TABLE_STREAM_THRESHOLD = 500
+
+
+def print_table(rows: Iterable[list[Any]], headers: list[str], widths: list[int]) -> int:
+    """Print a table, streaming rows at fixed column widths when there are many. Returns the row count."""
+    rows = iter(rows)
+    head = list(islice(rows, TABLE_STREAM_THRESHOLD + 1))
+    if len(head) <= TABLE_STREAM_THRESHOLD:
+        print(tabulate(head, headers=headers, tablefmt="simple"))
+        return len(head)
+
+    line = "  ".join(f"{{:<{w}.{w}}}" for w in widths)
+    print(line.format(*headers).rstrip())
+    print("  ".join("-" * w for w in widths))
+    count = 0
+    for row in chain(head, rows):
+        print(line.format(*map(str, row)).rstrip())
+        count += 1
+    return count
 
 
 def format_duration(seconds: int | str | None) -> str:
@@ -88,6 +642,10 @@ def format_date(timestamp: int | str | None) -> str:
 
 def cmd_history(args):
     """Get playback history."""
+    if args.local and args.all_servers:
+        print("Error: --local and --all-servers cannot be combined", file=sys.stderr)
+        sys.exit(1)
+
     params = {"length": args.limit}
 
     if args.days:
@@ -100,36 +658,51 @@ def cmd_history(args):
     if args.media_type:
         params["media_type"] = args.media_type
 
-    data = api_call("get_history", **params)
-    records = data.get("data", [])
+    records = stream_history_records(args.local, args.all_servers, **params)
+    if args.enrich:
+        records = enrich_records(records, workers=args.workers, chunk_size=min(args.limit, 1000))
 
     if args.json:
-        print(json.dumps(records, indent=2))
+        print(json.dumps(list(records), indent=2))
         return
 
-    if not records:
+    first = next(records, None)
+    if first is None:
         print("No history found")
         return
 
-    table = []
-    for r in records:
-        table.append([
+    table = (
+        [
             format_date(r.get("started")),
             r.get("user", "Unknown")[:15],
             r.get("full_title", "Unknown")[:40],
             r.get("media_type", "?"),
             format_duration(r.get("duration")),
             r.get("transcode_decision", "direct")[:10],
-        ])
+            *([r.get("video_resolution") or "", r.get("video_codec") or ""] if args.enrich else []),
+            *([r.get("server", "")[:12]] if args.all_servers else []),
+        ]
+        for r in chain([first], records)
+    )
 
     headers = ["Date", "User", "Title", "Type", "Duration", "Transcode"]
-    print(tabulate(table, headers=headers, tablefmt="simple"))
-    print(f"\nTotal: {len(records)} plays")
+    widths = [16, 15, 40, 7, 9, 10]
+    if args.enrich:
+        headers += ["Resolution", "Codec"]
+        widths += [10, 6]
+    if args.all_servers:
+        headers.append("Server")
+        widths.append(12)
+    count = print_table(table, headers, widths)
+    print(f"\nTotal: {count} plays")
 
 
 def cmd_users(args):
     """List users with stats."""
-    data = api_call("get_users")
+    if args.all_servers:
+        data = [{**u, "server": server} for server, users in fan_out("get_users").items() for u in users]
+    else:
+        data = api_call("get_users")
 
     if args.json:
         print(json.dumps(data, indent=2))
@@ -148,9 +721,10 @@ def cmd_users(args):
             u.get("friendly_name", ""),
             u.get("email", ""),
             format_date(u.get("last_seen")),
+            *([u["server"]] if args.all_servers else []),
         ])
 
-    headers = ["Username", "Friendly Name", "Email", "Last Seen"]
+    headers = ["Username", "Friendly Name", "Email", "Last Seen", *(["Server"] if args.all_servers else [])]
     print(tabulate(table, headers=headers, tablefmt="simple"))
 
 
@@ -181,9 +755,111 @@ def cmd_libraries(args):
     print(tabulate(table, headers=headers, tablefmt="simple"))
 
 
+def session_state(s: dict[str, Any]) -> tuple:
+    """The session fields that trigger a redraw when they change."""
+    return (s.get("state"), int(float(s.get("progress_percent") or 0)), s.get("transcode_decision"))
+
+
+def session_event(event: str, s: dict[str, Any], **extra) -> dict[str, Any]:
+    """Build a structured activity event for NDJSON output."""
+    return {
+        "event": event,
+        "time": int(time.time()),
+        "session_key": s.get("session_key"),
+        "user": s.get("user"),
+        "full_title": s.get("full_title"),
+        "state": s.get("state"),
+        "progress_percent": int(float(s.get("progress_percent") or 0)),
+        "transcode_decision": s.get("transcode_decision"),
+        "platform": s.get("platform"),
+        **({"server": s["server"]} if "server" in s else {}),
+        **extra,
+    }
+
+
+def fetch_activity(all_servers: bool = False) -> dict[str, Any]:
+    """Get current activity, merged across instances and tagged by server with all_servers."""
+    if not all_servers:
+        return api_call("get_activity")
+    results = fan_out("get_activity")
+    return {
+        "stream_count": sum(int(data.get("stream_count") or 0) for data in results.values()),
+        "sessions": [{**s, "server": server} for server, data in results.items() for s in data.get("sessions", [])],
+    }
+
+
+def follow_activity(args):
+    """Poll get_activity and report only sessions that changed."""
+    seen = {}
+    interval = args.interval
+
+    try:
+        while True:
+            try:
+                data = fetch_activity(args.all_servers)
+            except (requests.RequestException, TautulliAPIError) as e:
+                # Keep monitoring through outages; `seen` is kept so recovery does
+                # not report every session as stopped and started again
+                if args.json:
+                    event = {"event": "error", "time": int(time.time()), "message": str(e)}
+                    print(json.dumps(event, separators=(",", ":")), flush=True)
+                else:
+                    print(f"Warning: poll failed: {e}", file=sys.stderr)
+                interval = min(interval * 2, args.max_interval)
+                time.sleep(interval)
+                continue
+            sessions = {(s.get("server"), s.get("session_key")): s for s in data.get("sessions", [])}
+            events = []
+
+            for key, s in sessions.items():
+                old = seen.get(key)
+                if old is None:
+                    events.append(session_event("start", s))
+                    continue
+                old_state, new_state = session_state(old), session_state(s)
+                if old_state == new_state:
+                    continue
+                if old_state[2] != new_state[2]:
+                    events.append(session_event("transcode", s, previous=old_state[2]))
+                elif old_state[0] != new_state[0]:
+                    events.append(session_event("state", s, previous=old_state[0]))
+                else:
+                    events.append(session_event("progress", s))
+
+            for key in seen.keys() - sessions.keys():
+                events.append(session_event("stop", seen[key]))
+
+            seen = sessions
+
+            for e in events:
+                if args.json:
+                    if e["event"] != "progress":
+                        print(json.dumps(e, separators=(",", ":")))
+                else:
+                    print(
+                        f"{datetime.fromtimestamp(e['time']).strftime('%H:%M:%S')}  {e['event']:<9}  "
+                        f"{(e['user'] or 'Unknown')[:15]:<15}  {(e['full_title'] or 'Unknown')[:40]:<40}  "
+                        f"{e['state'] or '?':<9}  {e['progress_percent']:>3}%  {e['transcode_decision'] or 'direct'}"
+                    )
+            sys.stdout.flush()
+
+            # Poll quickly while streams are active, back off while idle
+            if sessions:
+                interval = max(args.interval / max(1, len(sessions) // 5), 1)
+            else:
+                interval = min(interval * 2, args.max_interval)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+
 def cmd_watching(args):
     """Get current activity."""
-    data = api_call("get_activity")
+    if args.follow:
+        follow_activity(args)
+        return
+
+    data = fetch_activity(args.all_servers)
     sessions = data.get("sessions", [])
 
     if args.json:
@@ -209,9 +885,12 @@ def cmd_watching(args):
             s.get("quality_profile", "?"),
             s.get("transcode_decision", "direct"),
             s.get("platform", "?"),
+            *([s["server"]] if args.all_servers else []),
         ])
 
     headers = ["User", "Title", "State", "Progress", "Quality", "Transcode", "Platform"]
+    if args.all_servers:
+        headers.append("Server")
     print(tabulate(table, headers=headers, tablefmt="simple"))
 
 
@@ -266,41 +945,75 @@ def cmd_stats(args):
     # Get multiple stat types
     stat_ids = ["top_users", "top_platforms", "most_concurrent"]
 
-    data = api_call("get_home_stats", time_range=days, stats_count=10)
+    if args.all_servers:
+        results = fan_out("get_home_stats", time_range=days, stats_count=10)
+    else:
+        results = {None: api_call("get_home_stats", time_range=days, stats_count=10)}
 
     if args.json:
-        print(json.dumps(data, indent=2))
+        print(json.dumps(results if args.all_servers else results[None], indent=2))
         return
 
-    print(f"Statistics for last {days} days\n")
+    # Merge each stat's rows across servers, re-ranked by their count
+    rows_by_stat = {stat_id: [] for stat_id in stat_ids}
+    for server, data in results.items():
+        for stat in data:
+            if stat.get("stat_id") in rows_by_stat:
+                rows_by_stat[stat["stat_id"]] += [{**r, "server": server} for r in stat.get("rows", [])]
+    for stat_id, rows in rows_by_stat.items():
+        count_field = "count" if stat_id == "most_concurrent" else "total_plays"
+        rows.sort(key=lambda r: int(r.get(count_field) or 0), reverse=True)
 
-    for stat in data:
-        stat_id = stat.get("stat_id", "")
-        rows = stat.get("rows", [])
+    def server_col(r):
+        return [r["server"]] if args.all_servers else []
 
-        if stat_id == "top_users" and rows:
-            print("TOP USERS")
-            table = [[r.get("user", "?"), r.get("total_plays", 0), format_duration(r.get("total_duration"))] for r in rows[:5]]
-            print(tabulate(table, headers=["User", "Plays", "Watch Time"], tablefmt="simple"))
-            print()
+    server_header = ["Server"] if args.all_servers else []
 
-        elif stat_id == "top_platforms" and rows:
-            print("TOP PLATFORMS")
-            table = [[r.get("platform", "?"), r.get("total_plays", 0)] for r in rows[:5]]
-            print(tabulate(table, headers=["Platform", "Plays"], tablefmt="simple"))
-            print()
+    print(f"Statistics for last {days} days\n")
 
-        elif stat_id == "most_concurrent" and rows:
-            print("PEAK CONCURRENT STREAMS")
-            table = [[format_date(r.get("started")), r.get("count", 0)] for r in rows[:3]]
-            print(tabulate(table, headers=["Time", "Streams"], tablefmt="simple"))
-            print()
+    rows = rows_by_stat["top_users"]
+    if rows:
+        print("TOP USERS")
+        table = [[r.get("user", "?"), r.get("total_plays", 0), format_duration(r.get("total_duration")), *server_col(r)] for r in rows[:5]]
+        print(tabulate(table, headers=["User", "Plays", "Watch Time", *server_header], tablefmt="simple"))
+        print()
+
+    rows = rows_by_stat["top_platforms"]
+    if rows:
+        print("TOP PLATFORMS")
+        table = [[r.get("platform", "?"), r.get("total_plays", 0), *server_col(r)] for r in rows[:5]]
+        print(tabulate(table, headers=["Platform", "Plays", *server_header], tablefmt="simple"))
+        print()
+
+    rows = rows_by_stat["most_concurrent"]
+    if rows:
+        print("PEAK CONCURRENT STREAMS")
+        table = [[format_date(r.get("started")), r.get("count", 0), *server_col(r)] for r in rows[:3]]
+        print(tabulate(table, headers=["Time", "Streams", *server_header], tablefmt="simple"))
+        print()
+
+
+def summarize_history(records: list[dict[str, Any]]) -> dict[str, Any]:
+    """Summarize plays, watch time and per-type counts for history records."""
+    by_type = {}
+    total_duration = 0
+    last_played = 0
+    for r in records:
+        mtype = r.get("media_type", "unknown")
+        by_type[mtype] = by_type.get(mtype, 0) + 1
+        total_duration += int(r.get("duration") or 0)
+        last_played = max(last_played, int(r.get("started") or 0))
+    return {
+        "plays": len(records),
+        "duration": total_duration,
+        "by_type": by_type,
+        "last_played": last_played,
+    }
 
 
 def cmd_user_history(args):
     """Get detailed history for a specific user."""
-    data = api_call("get_history", user=args.username, length=args.limit)
-    records = data.get("data", [])
+    records = get_history_records(args.local, user=args.username, length=args.limit)
 
     if args.json:
         print(json.dumps(records, indent=2))
@@ -310,21 +1023,15 @@ def cmd_user_history(args):
         print(f"No history found for user: {args.username}")
         return
 
-    # Group by media type
-    by_type = {}
-    total_duration = 0
-    for r in records:
-        mtype = r.get("media_type", "unknown")
-        by_type.setdefault(mtype, []).append(r)
-        total_duration += int(r.get("duration") or 0)
+    summary = summarize_history(records)
 
     print(f"History for: {args.username}")
-    print(f"Total plays: {len(records)}")
-    print(f"Total watch time: {format_duration(total_duration)}")
+    print(f"Total plays: {summary['plays']}")
+    print(f"Total watch time: {format_duration(summary['duration'])}")
     print()
 
-    for mtype, items in by_type.items():
-        print(f"{mtype.upper()}: {len(items)} plays")
+    for mtype, count in summary["by_type"].items():
+        print(f"{mtype.upper()}: {count} plays")
 
     print("\nRecent activity:")
     table = []
@@ -339,36 +1046,527 @@ def cmd_user_history(args):
     print(tabulate(table, headers=headers, tablefmt="simple"))
 
 
+def cmd_users_history(args):
+    """Get history summaries for many users concurrently."""
+    usernames = args.usernames
+    if args.all or not usernames:
+        usernames = [u["username"] for u in api_call("get_users") if u.get("username") and u.get("username") != "Local"]
+
+    def fetch(username):
+        return get_history_records(args.local, user=username, length=args.limit)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = dict(zip(usernames, pool.map(fetch, usernames)))
+
+    summaries = {u: summarize_history(records) for u, records in results.items()}
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+
+    if not summaries:
+        print("No users found")
+        return
+
+    types = sorted({t for s in summaries.values() for t in s["by_type"]})
+    table = []
+    for username, summary in sorted(summaries.items(), key=lambda x: x[1]["duration"], reverse=True):
+        table.append([
+            username[:15],
+            summary["plays"],
+            format_duration(summary["duration"]),
+            *(summary["by_type"].get(t, 0) for t in types),
+            format_date(summary["last_played"]),
+        ])
+
+    headers = ["User", "Plays", "Watch Time", *(t.capitalize() for t in types), "Last Played"]
+    print(tabulate(table, headers=headers, tablefmt="simple"))
+    print(f"\nUsers: {len(summaries)} (up to {args.limit} plays each)")
+
+
 def cmd_search(args):
     """Search history."""
-    data = api_call("get_history", search=args.query, length=args.limit)
-    records = data.get("data", [])
+    records = stream_history_records(args.local, search=args.query, length=args.limit)
 
     if args.json:
-        print(json.dumps(records, indent=2))
+        print(json.dumps(list(records), indent=2))
         return
 
-    if not records:
+    first = next(records, None)
+    if first is None:
         print(f"No results for: {args.query}")
         return
 
     print(f"Search results for: {args.query}\n")
 
-    table = []
-    for r in records:
-        table.append([
+    table = (
+        [
             format_date(r.get("started")),
             r.get("user", "?")[:12],
             r.get("full_title", "Unknown")[:40],
             format_duration(r.get("duration")),
-        ])
+        ]
+        for r in chain([first], records)
+    )
 
     headers = ["Date", "User", "Title", "Duration"]
+    print_table(table, headers, [16, 12, 40, 9])
+
+
+EXPORT_FIELDS = [
+    "reference_id", "row_id", "id", "started", "stopped", "duration", "paused_counter",
+    "user_id", "user", "friendly_name", "platform", "product", "player", "ip_address",
+    "media_type", "rating_key", "parent_rating_key", "grandparent_rating_key",
+    "full_title", "title", "parent_title", "grandparent_title", "year",
+    "media_index", "parent_media_index", "transcode_decision", "percent_complete",
+    "watched_status", "location",
+]
+
+# Column types for parquet/arrow export; low-cardinality strings are dictionary-encoded
+EXPORT_TYPES = {
+    "reference_id": "int64", "row_id": "int64", "id": "int64",
+    "started": "timestamp", "stopped": "timestamp",
+    "duration": "int32", "paused_counter": "int32", "user_id": "int64",
+    "user": "dictionary", "friendly_name": "dictionary", "platform": "dictionary",
+    "product": "dictionary", "player": "dictionary", "ip_address": "dictionary",
+    "media_type": "dictionary", "rating_key": "int64", "parent_rating_key": "int64",
+    "grandparent_rating_key": "int64", "full_title": "string", "title": "string",
+    "parent_title": "string", "grandparent_title": "dictionary", "year": "int16",
+    "media_index": "int32", "parent_media_index": "int32",
+    "transcode_decision": "dictionary", "percent_complete": "int16",
+    "watched_status": "float32", "location": "dictionary",
+}
+
+
+def write_columnar(
+    records: Iterator[dict[str, Any]], path: str | None, fmt: str, row_group_size: int, column_types: dict[str, str]
+) -> int:
+    """Write records as typed parquet/arrow columns, one row group at a time."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print(f"Error: --format {fmt} requires pyarrow (uv run --with pyarrow ...)", file=sys.stderr)
+        sys.exit(1)
+
+    types = {
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "int16": pa.int16(),
+        "float32": pa.float32(),
+        "timestamp": pa.timestamp("s"),
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in column_types.items()])
+    # One growing dictionary per column: later batches only append labels, so
+    # arrow files carry dictionary deltas instead of (disallowed) replacements
+    codes = {name: {} for name, kind in column_types.items() if kind == "dictionary"}
+
+    def convert(name, kind, value):
+        if value is None or value == "":
+            return None
+        if kind == "dictionary":
+            return codes[name].setdefault(str(value), len(codes[name]))
+        if kind == "string":
+            return str(value)
+        if kind == "float32":
+            return float(value)
+        return int(value)
+
+    sink = path or sys.stdout.buffer
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+    count = 0
+    columns = {name: [] for name in column_types}
+
+    def column(name):
+        if name in codes:
+            indices = pa.array(columns[name], type=pa.int32())
+            return pa.DictionaryArray.from_arrays(indices, pa.array(list(codes[name]), type=pa.string()))
+        return pa.array(columns[name], type=schema.field(name).type)
+
+    def flush():
+        batch = pa.RecordBatch.from_arrays([column(name) for name in column_types], schema=schema)
+        if fmt == "parquet":
+            writer.write_batch(batch, row_group_size=row_group_size)
+        else:
+            writer.write_batch(batch)
+        for values in columns.values():
+            values.clear()
+
+    try:
+        for r in records:
+            for name, kind in column_types.items():
+                columns[name].append(convert(name, kind, r.get(name)))
+            count += 1
+            if count % row_group_size == 0:
+                flush()
+        if count % row_group_size:
+            flush()
+    finally:
+        writer.close()
+
+    return count
+
+
+def cmd_export(args):
+    """Stream playback history to NDJSON, CSV, parquet or arrow without buffering it."""
+    params = {}
+
+    if args.days:
+        start = datetime.now() - timedelta(days=args.days)
+        params["start_date"] = start.strftime("%Y-%m-%d")
+
+    if args.user:
+        params["user"] = args.user
+
+    if args.media_type:
+        params["media_type"] = args.media_type
+
+    records = iter_history(page_size=args.page_size, limit=args.limit, **params)
+    fields = EXPORT_FIELDS
+    column_types = EXPORT_TYPES
+    if args.enrich:
+        records = enrich_records(records, workers=args.workers, chunk_size=args.page_size)
+        fields = EXPORT_FIELDS + list(ENRICH_TYPES)
+        column_types = {**EXPORT_TYPES, **ENRICH_TYPES}
+
+    if args.format in ("parquet", "arrow"):
+        count = write_columnar(records, args.output, args.format, args.row_group_size, column_types)
+        if args.output:
+            print(f"Exported {count} plays to {args.output}", file=sys.stderr)
+        return
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+
+    count = 0
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for r in records:
+                writer.writerow(r)
+                count += 1
+                if count % args.page_size == 0:
+                    out.flush()
+        else:
+            for r in records:
+                out.write(json.dumps(r, separators=(",", ":")) + "\n")
+                count += 1
+                if count % args.page_size == 0:
+                    out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.output:
+        print(f"Exported {count} plays to {args.output}", file=sys.stderr)
+
+
+def cmd_sync(args):
+    """Sync new history rows into the local SQLite mirror."""
+    conn = open_history_db()
+
+    if args.full:
+        conn.execute("DELETE FROM history")
+        conn.execute("DELETE FROM sync_state")
+        if has_fts(conn):
+            conn.execute("DELETE FROM history_fts")
+        conn.commit()
+
+    state = conn.execute("SELECT last_reference_id, last_started FROM sync_state").fetchone()
+    last_reference_id, last_started = state or (0, 0)
+    before = conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    # Tautulli writes a row when a play stops, keeping its original start time,
+    # so `started` is not monotonic in write order: a play that was running
+    # during the last sync starts before its mark. Re-scan an overlap window
+    # behind the mark and let INSERT OR REPLACE absorb rows already mirrored.
+    # Ungrouped history is ordered by start time, one row per session. The mark
+    # only advances after a complete pass so an interrupted sync is resumed.
+    cutoff = last_started - args.overlap_hours * 3600 if last_started else 0
+    new_reference_id, new_started = last_reference_id, last_started
+    batch = []
+    for r in iter_history(page_size=args.page_size, grouping=0, order_column="date", order_dir="desc"):
+        started = int(r.get("started") or 0)
+        reference_id = int(r.get("reference_id") or 0)
+        if started < cutoff:
+            break
+        batch.append(r)
+        if started > new_started or (started == new_started and reference_id > new_reference_id):
+            new_reference_id, new_started = reference_id, started
+        if len(batch) >= args.page_size:
+            store_history(conn, batch)
+            conn.commit()
+            batch = []
+
+    store_history(conn, batch)
+    conn.execute(
+        "INSERT OR REPLACE INTO sync_state VALUES (1, ?, ?, ?)",
+        (new_reference_id, new_started, int(datetime.now().timestamp())),
+    )
+    conn.commit()
+
+    total = conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+    conn.close()
+    print(f"Synced {total - before} new plays ({total} in local mirror)")
+
+
+def load_intervals(args) -> tuple[array, array, array, array]:
+    """Load play start/stop times into arrays, split into all and transcode-only."""
+    starts, stops = array("q"), array("q")
+    tc_starts, tc_stops = array("q"), array("q")
+
+    after = int((datetime.now() - timedelta(days=args.days)).timestamp()) if args.days else 0
+
+    if args.local:
+        conn = open_history_db(must_exist=True)
+        sql = "SELECT started, stopped, duration, transcode_decision FROM history WHERE started >= ?"
+        values = [after]
+        if args.user:
+            sql += " AND user = ?"
+            values.append(args.user)
+        if args.media_type:
+            sql += " AND media_type = ?"
+            values.append(args.media_type)
+        rows = conn.execute(sql, values)
+    else:
+        params = {"user": args.user, "media_type": args.media_type}
+        if args.days:
+            params["start_date"] = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d")
+        rows = (
+            (r.get("started"), r.get("stopped"), r.get("duration"), r.get("transcode_decision"))
+            for r in iter_history(page_size=args.page_size, **params)
+        )
+
+    for started, stopped, duration, decision in rows:
+        started = int(started or 0)
+        if not started or started < after:
+            continue
+        stopped = int(stopped or 0)
+        if stopped <= started:
+            stopped = started + int(duration or 0)
+        if stopped <= started:
+            continue
+        starts.append(started)
+        stops.append(stopped)
+        if decision == "transcode":
+            tc_starts.append(started)
+            tc_stops.append(stopped)
+
+    if args.local:
+        conn.close()
+
+    return starts, stops, tc_starts, tc_stops
+
+
+def sweep_concurrency(starts: array, stops: array) -> dict[str, Any]:
+    """Compute the concurrent-stream curve with a sorted-endpoint sweep."""
+    starts = sorted(starts)
+    stops = sorted(stops)
+    n = len(starts)
+    time_at = [0]
+    hour_peaks = [0] * 24
+    hour_cache = {}
+    peak = peak_at = 0
+    level = 0
+    prev = starts[0] if n else 0
+    i = j = 0
+
+    def hour_of(t):
+        bucket = t // 3600
+        hour = hour_cache.get(bucket)
+        if hour is None:
+            hour = hour_cache[bucket] = time.localtime(t).tm_hour
+        return hour
+
+    while j < n:
+        # Stops sort before starts at the same instant so back-to-back plays
+        # do not count as overlapping.
+        if i < n and starts[i] < stops[j]:
+            t, delta = starts[i], 1
+            i += 1
+        else:
+            t, delta = stops[j], -1
+            j += 1
+
+        if t > prev and level:
+            time_at[level] += t - prev
+            # Credit the level to every hour of day the interval touches
+            span_start = prev - prev % 3600
+            for h in range(span_start, min(t, span_start + 24 * 3600), 3600):
+                hour = hour_of(h)
+                if level > hour_peaks[hour]:
+                    hour_peaks[hour] = level
+        prev = t
+
+        level += delta
+        if level >= len(time_at):
+            time_at.append(0)
+        if level > peak:
+            peak, peak_at = level, t
+
+    return {"plays": n, "peak": peak, "peak_at": peak_at, "time_at": time_at, "hour_peaks": hour_peaks}
+
+
+def concurrency_percentiles(time_at: list[int], percentiles=(50, 90, 95, 99)) -> dict[str, int]:
+    """Time-weighted concurrency percentiles over time with at least one stream."""
+    active = sum(time_at[1:])
+    result = {}
+    for pct in percentiles:
+        target = active * pct / 100
+        running = 0
+        level = 0
+        for level in range(1, len(time_at)):
+            running += time_at[level]
+            if running >= target:
+                break
+        result[f"p{pct}"] = level
+    return result
+
+
+def cmd_concurrency(args):
+    """Compute concurrent stream statistics from history intervals."""
+    starts, stops, tc_starts, tc_stops = load_intervals(args)
+
+    if not starts:
+        print("No history found")
+        return
+
+    curves = {"all": sweep_concurrency(starts, stops), "transcode": sweep_concurrency(tc_starts, tc_stops)}
+    for curve in curves.values():
+        curve["percentiles"] = concurrency_percentiles(curve["time_at"])
+
+    if args.json:
+        print(json.dumps(curves, indent=2))
+        return
+
+    span = f"last {args.days} days" if args.days else "all history"
+    print(f"Concurrency for {span} ({len(starts)} plays, {len(tc_starts)} transcodes)\n")
+
+    table = []
+    for name, curve in curves.items():
+        pct = curve["percentiles"]
+        table.append([
+            name, curve["peak"], format_date(curve["peak_at"]), pct["p50"], pct["p90"], pct["p95"], pct["p99"],
+        ])
+    print(tabulate(table, headers=["Streams", "Peak", "Peak Time", "p50", "p90", "p95", "p99"], tablefmt="simple"))
+    print()
+
+    print("TIME AT CONCURRENCY LEVEL")
+    time_at = curves["all"]["time_at"]
+    active = sum(time_at[1:]) or 1
+    table = []
+    cumulative = 0
+    for level in range(len(time_at) - 1, 0, -1):
+        cumulative += time_at[level]
+        table.append([f">= {level}", format_duration(cumulative), f"{cumulative / active * 100:.1f}%"])
+    print(tabulate(table[::-1], headers=["Streams", "Time", "% Active"], tablefmt="simple"))
+    print()
+
+    print("PEAK BY HOUR OF DAY")
+    table = [[f"{h:02d}:00", curves["all"]["hour_peaks"][h], curves["transcode"]["hour_peaks"][h]] for h in range(24)]
+    print(tabulate(table, headers=["Hour", "All", "Transcode"], tablefmt="simple"))
+
+
+TREND_GRAPHS = {
+    "daily": ("get_plays_by_date", "Date", "BY DATE"),
+    "weekly": ("get_plays_by_dayofweek", "Day", "BY DAY OF WEEK"),
+    "hourly": ("get_plays_by_hourofday", "Hour", "BY HOUR OF DAY"),
+    "stream-type": ("get_plays_by_stream_type", "Date", "BY STREAM TYPE"),
+}
+
+
+def resolve_user_id(username: str) -> int:
+    """Look up a user_id by username or friendly name."""
+    for u in api_call("get_users"):
+        if username.lower() in (str(u.get("username", "")).lower(), str(u.get("friendly_name", "")).lower()):
+            return u["user_id"]
+    print(f"Error: Unknown user: {username}", file=sys.stderr)
+    sys.exit(1)
+
+
+def print_graph(title: str, label: str, graph: dict[str, Any], y_axis: str):
+    """Print a get_plays_by_* graph as a table with a totals row."""
+    categories = graph.get("categories", [])
+    series = graph.get("series", [])
+    fmt = format_duration if y_axis == "duration" else str
+
+    print(title)
+    if not categories:
+        print("No data\n")
+        return
+
+    table = []
+    for i, category in enumerate(categories):
+        values = [int(s["data"][i] or 0) for s in series]
+        table.append([category, *map(fmt, values), fmt(sum(values))])
+    totals = [sum(int(v or 0) for v in s["data"]) for s in series]
+    table.append(["Total", *map(fmt, totals), fmt(sum(totals))])
+
+    headers = [label, *(s.get("name", "?") for s in series), "Total"]
     print(tabulate(table, headers=headers, tablefmt="simple"))
+    print()
+
+
+def cmd_trends(args):
+    """Show play trends from the pre-aggregated graph endpoints."""
+    views = list(TREND_GRAPHS) + ["libraries"] if args.view == "all" else [args.view]
+    user_id = resolve_user_id(args.user) if args.user else None
+    params = {"time_range": args.days, "y_axis": args.y_axis, "user_id": user_id}
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            view: pool.submit(api_call, TREND_GRAPHS[view][0], **params)
+            for view in views if view in TREND_GRAPHS
+        }
+        if "libraries" in views:
+            libraries = api_call("get_libraries")
+            query_days = f"1,7,{args.days},0"
+            library_futures = [
+                (lib, pool.submit(api_call, "get_library_watch_time_stats", section_id=lib["section_id"], query_days=query_days))
+                for lib in libraries
+            ]
+        results = {view: future.result() for view, future in futures.items()}
+        if "libraries" in views:
+            results["libraries"] = [
+                {"section_id": lib["section_id"], "section_name": lib.get("section_name"), "stats": future.result()}
+                for lib, future in library_futures
+            ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    who = f" for {args.user}" if args.user else ""
+    print(f"Trends for last {args.days} days{who}\n")
+
+    measure = "WATCH TIME" if args.y_axis == "duration" else "PLAYS"
+    for view in views:
+        if view in TREND_GRAPHS:
+            _, label, title = TREND_GRAPHS[view]
+            print_graph(f"{measure} {title}", label, results[view], args.y_axis)
+
+    if "libraries" in views:
+        print("LIBRARY WATCH TIME")
+        table = []
+        for lib in results["libraries"]:
+            row = [lib["section_name"]]
+            for stat in lib["stats"] or []:
+                row.append(f"{stat.get('total_plays', 0)} / {format_duration(stat.get('total_time'))}")
+            table.append(row)
+        headers = ["Library", "Last 24h", "Last 7d", f"Last {args.days}d", "All Time"]
+        print(tabulate(table, headers=headers, tablefmt="simple"))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Tautulli analytics tool")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the response cache")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached responses and re-fetch")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Common arguments
@@ -382,11 +1580,16 @@ def main():
     p.add_argument("--days", type=int, help="Limit to last N days")
     p.add_argument("--user", help="Filter by username")
     p.add_argument("--media-type", choices=["movie", "episode", "track"], help="Filter by type")
+    p.add_argument("--local", action="store_true", help="Query local mirror instead of the API")
+    p.add_argument("--enrich", action="store_true", help="Add genre, resolution, codec and file size")
+    p.add_argument("--workers", type=int, default=8, help="Max concurrent metadata requests")
+    p.add_argument("--all-servers", action="store_true", help="Query every instance in TAUTULLI_INSTANCES")
     p.set_defaults(func=cmd_history)
 
     # users
     p = subparsers.add_parser("users", help="List users")
     add_common(p)
+    p.add_argument("--all-servers", action="store_true", help="Query every instance in TAUTULLI_INSTANCES")
     p.set_defaults(func=cmd_users)
 
     # libraries
@@ -397,6 +1600,10 @@ def main():
     # watching
     p = subparsers.add_parser("watching", help="Current activity")
     add_common(p)
+    p.add_argument("--follow", "-f", action="store_true", help="Keep polling and print changes (NDJSON events with --json)")
+    p.add_argument("--interval", type=float, default=10, help="Seconds between polls while streams are active")
+    p.add_argument("--max-interval", type=float, default=60, help="Max seconds between polls while idle")
+    p.add_argument("--all-servers", action="store_true", help="Query every instance in TAUTULLI_INSTANCES")
     p.set_defaults(func=cmd_watching)
 
     # popular
@@ -410,22 +1617,82 @@ def main():
     p = subparsers.add_parser("stats", help="Server statistics")
     add_common(p)
     p.add_argument("--days", type=int, default=30, help="Time range in days")
+    p.add_argument("--all-servers", action="store_true", help="Query every instance in TAUTULLI_INSTANCES")
     p.set_defaults(func=cmd_stats)
 
     # user-history
     p = subparsers.add_parser("user-history", help="History for specific user")
     add_common(p)
     p.add_argument("username", help="Username to look up")
+    p.add_argument("--local", action="store_true", help="Query local mirror instead of the API")
     p.set_defaults(func=cmd_user_history)
 
+    # users-history
+    p = subparsers.add_parser("users-history", help="Summary for many users, fetched in parallel")
+    add_common(p)
+    p.add_argument("usernames", nargs="*", help="Usernames to look up (default: all users)")
+    p.add_argument("--all", action="store_true", help="Look up every user from get_users")
+    p.add_argument("--workers", type=int, default=8, help="Max concurrent requests")
+    p.add_argument("--local", action="store_true", help="Query local mirror instead of the API")
+    p.set_defaults(func=cmd_users_history)
+
+    # concurrency
+    p = subparsers.add_parser("concurrency", help="Concurrent stream curve computed from history")
+    p.add_argument("--json", action="store_true", help="Output as JSON")
+    p.add_argument("--days", type=int, help="Limit to last N days")
+    p.add_argument("--user", help="Filter by username")
+    p.add_argument("--media-type", choices=["movie", "episode", "track"], help="Filter by type")
+    p.add_argument("--page-size", type=int, default=1000, help="Records per API request")
+    p.add_argument("--local", action="store_true", help="Read intervals from the local mirror")
+    p.set_defaults(func=cmd_concurrency)
+
+    # trends
+    p = subparsers.add_parser("trends", help="Exact play/watch-time trends from server-side graphs")
+    p.add_argument("view", nargs="?", choices=["all", *TREND_GRAPHS, "libraries"], default="all")
+    p.add_argument("--json", action="store_true", help="Output as JSON")
+    p.add_argument("--days", type=int, default=30, help="Time range in days")
+    p.add_argument("--user", help="Limit to one user")
+    p.add_argument("--y-axis", choices=["plays", "duration"], default="plays", help="Count plays or watch time")
+    p.add_argument("--workers", type=int, default=8, help="Max concurrent requests")
+    p.set_defaults(func=cmd_trends)
+
     # search
     p = subparsers.add_parser("search", help="Search history")
     add_common(p)
     p.add_argument("query", help="Search query")
+    p.add_argument("--local", action="store_true", help="Query local mirror instead of the API")
     p.set_defaults(func=cmd_search)
 
+    # export
+    p = subparsers.add_parser("export", help="Stream full history as NDJSON, CSV, parquet or arrow")
+    p.add_argument("--format", choices=["ndjson", "csv", "parquet", "arrow"], default="ndjson", help="Output format")
+    p.add_argument("--output", "-o", help="Output file (default: stdout)")
+    p.add_argument("--page-size", type=int, default=1000, help="Records per API request")
+    p.add_argument("--row-group-size", type=int, default=100000, help="Rows per parquet row group / arrow batch")
+    p.add_argument("--enrich", action="store_true", help="Add genre, resolution, codec and file size")
+    p.add_argument("--workers", type=int, default=8, help="Max concurrent metadata requests")
+    p.add_argument("--limit", type=int, help="Stop after N records (default: all)")
+    p.add_argument("--days", type=int, help="Limit to last N days")
+    p.add_argument("--user", help="Filter by username")
+    p.add_argument("--media-type", choices=["movie", "episode", "track"], help="Filter by type")
+    p.set_defaults(func=cmd_export)
+
+    # sync
+    p = subparsers.add_parser("sync", help="Update local SQLite history mirror")
+    p.add_argument("--page-size", type=int, default=1000, help="Records per API request")
+    p.add_argument("--full", action="store_true", help="Discard the mirror and re-download everything")
+    p.add_argument(
+        "--overlap-hours", type=float, default=24, help="Re-scan plays started this long before the last sync (default: 24)"
+    )
+    p.set_defaults(func=cmd_sync)
+
     args = parser.parse_args()
-    args.func(args)
+    configure_client(cache=not args.no_cache, refresh=args.refresh)
+    try:
+        args.func(args)
+    except TautulliAPIError as e:
+        print(f"API Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":